@@ -25,6 +25,13 @@ from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Tuple
 
+# Fast JSON for company database loads (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # ============================================================
 # THRESHOLD CONSTANTS
 # ============================================================
@@ -83,6 +90,12 @@ CONFIDENCE_LOW = 0.25
 STALENESS_FINANCIAL = 100        # Financials, NDR, customer counts
 STALENESS_COMPETITIVE = 180      # Competitive assessment
 
+# --- Stale Field Labels (each check_staleness entry starts with one) ---
+STALE_FINANCIALS = 'financials'
+STALE_NDR = 'NDR'
+STALE_COMPETITIVE = 'competitive assessment'
+STALE_NO_DATE = 'data_updated'
+
 # --- Entry/Exit Signal Counts ---
 ENTRY_STRONG_BUY = 5             # 5/5 entry signals
 ENTRY_BUY = 4                    # 4/5
@@ -257,11 +270,9 @@ def calculate_confidence_score(data: CompanyData) -> float:
         score += SIGNAL_WEIGHTS['revenue_growth_current']
 
     if data.revenue_decel_3q is True or data.revenue_decel_3q is False:
-        # Trend data was explicitly assessed (not just default)
-        if data.revenue_decel_3q is True:
-            score += SIGNAL_WEIGHTS['revenue_growth_trend']
-        else:
-            score += SIGNAL_WEIGHTS['revenue_growth_trend']
+        # Trend data was explicitly assessed (not just default); either
+        # answer earns the same credit
+        score += SIGNAL_WEIGHTS['revenue_growth_trend']
 
     if data.arr_millions is not None:
         score += SIGNAL_WEIGHTS['arr_disclosed']
@@ -303,30 +314,31 @@ def score_to_confidence_level(score: float) -> str:
 def check_staleness(data: CompanyData) -> Tuple[bool, List[str]]:
     """Check if key data is stale (> threshold days old).
 
-    Returns (is_stale, list_of_stale_fields).
+    Returns (is_stale, list_of_stale_fields). Each field is one of the
+    STALE_* labels followed by a parenthesized detail for display.
     """
     stale_fields = []
 
     if not data.data_updated:
         # No update date recorded — can't check, flag it
-        return True, ['data_updated (no date recorded)']
+        return True, [f'{STALE_NO_DATE} (no date recorded)']
 
     try:
         updated = datetime.strptime(data.data_updated, '%Y-%m-%d')
     except (ValueError, TypeError):
-        return True, ['data_updated (invalid date format)']
+        return True, [f'{STALE_NO_DATE} (invalid date format)']
 
     now = datetime.now()
     days_old = (now - updated).days
 
     if days_old > STALENESS_FINANCIAL:
-        stale_fields.append(f'financials ({days_old} days old)')
+        stale_fields.append(f'{STALE_FINANCIALS} ({days_old} days old)')
 
     if data.ndr is not None and days_old > STALENESS_FINANCIAL:
-        stale_fields.append(f'NDR ({days_old} days old)')
+        stale_fields.append(f'{STALE_NDR} ({days_old} days old)')
 
     if days_old > STALENESS_COMPETITIVE:
-        stale_fields.append(f'competitive assessment ({days_old} days old)')
+        stale_fields.append(f'{STALE_COMPETITIVE} ({days_old} days old)')
 
     return len(stale_fields) > 0, stale_fields
 
@@ -1262,6 +1274,11 @@ def load_company_database(path: str = None) -> Dict[str, dict]:
     if path is None:
         path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'company_database.json')
 
+    # orjson (optional) parses the same JSON ~3x faster than the stdlib
+    if ORJSON_AVAILABLE:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+
     with open(path, 'r') as f:
         return json.load(f)
 
@@ -19,6 +19,13 @@ from typing import Optional, List, Dict, Any
 from rich.console import Console
 from rich.table import Table
 
+# Fast JSON for RPC payloads (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 console = Console()
 
 # RALPH token address
@@ -59,18 +66,19 @@ class GenesisAnalyzer:
             "method": method,
             "params": params
         }
+        body = orjson.dumps(payload) if ORJSON_AVAILABLE else json.dumps(payload)
 
         for attempt in range(3):
             try:
                 url = RPC_URLS[self.rpc_index % len(RPC_URLS)]
                 response = self.session.post(
                     url,
-                    json=payload,
+                    data=body,
                     timeout=30,
                     headers={"Content-Type": "application/json"}
                 )
                 response.raise_for_status()
-                result = response.json()
+                result = orjson.loads(response.content) if ORJSON_AVAILABLE else response.json()
 
                 if "error" in result:
                     console.print(f"[yellow]RPC error: {result['error']}[/yellow]")
@@ -25,6 +25,7 @@ import os
 import smtplib
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field, asdict
 from datetime import datetime, timedelta, timezone
 from email.mime.multipart import MIMEMultipart
@@ -33,6 +34,7 @@ from pathlib import Path
 from typing import Dict, List, Optional, Any
 import base58
 import requests
+from requests.adapters import HTTPAdapter
 import yaml
 from dotenv import load_dotenv
 
@@ -43,6 +45,13 @@ from rich.panel import Panel
 from rich.text import Text
 from rich import box
 
+# Fast JSON for RPC payloads (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Trend analysis module
 try:
     from ralph_trend_analysis import TrendTracker, TrendScore, TrendSignal
@@ -77,6 +86,10 @@ class WalletState:
     notes: str = ""
 
 
+# Trade direction implied by each signal type; other types carry none
+SIGNAL_DIRECTIONS = {"WHALE_BUY": "BUY", "WHALE_SELL": "SELL"}
+
+
 @dataclass
 class Signal:
     """Represents a detected signal/event."""
@@ -91,6 +104,10 @@ class Signal:
     target_label: str = ""  # For CEX transfers
     timestamp: str = ""
     severity: str = "INFO"  # INFO, WARNING, CRITICAL
+    direction: str = field(default="", init=False)  # BUY | SELL | "" (from signal_type)
+
+    def __post_init__(self):
+        self.direction = SIGNAL_DIRECTIONS.get(self.signal_type, "")
 
 
 @dataclass
@@ -181,6 +198,15 @@ def load_config(config_path: str) -> TrackerConfig:
 def save_state(state: Dict[str, WalletState], state_file: str):
     """Save wallet states to JSON file."""
     data = {addr: asdict(ws) for addr, ws in state.items()}
+    if ORJSON_AVAILABLE:
+        try:
+            body = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            body = None  # e.g. a balance beyond 64 bits; the stdlib handles it
+        if body is not None:
+            with open(state_file, 'wb') as f:
+                f.write(body)
+            return
     with open(state_file, 'w') as f:
         json.dump(data, f, indent=2)
 
@@ -206,11 +232,18 @@ def load_state(state_file: str) -> Dict[str, WalletState]:
 class SolanaRPCClient:
     """Client for interacting with Solana RPC."""
 
+    POOL_SIZE = 32  # Keep-alive connections per RPC host; covers the tracker's RPC workers
+
     def __init__(self, config: TrackerConfig):
         self.config = config
         self.rpc_urls = [config.rpc_url] + config.rpc_backup_urls
         self.current_rpc_index = 0
         self.session = requests.Session()
+        # Retries stay in _rpc_call, which rotates to a backup URL between
+        # attempts; the adapter only widens the keep-alive pool
+        adapter = HTTPAdapter(pool_connections=len(self.rpc_urls), pool_maxsize=self.POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
 
     def _get_rpc_url(self) -> str:
         """Get current RPC URL."""
@@ -229,17 +262,18 @@ class SolanaRPCClient:
             "method": method,
             "params": params
         }
+        body = orjson.dumps(payload) if ORJSON_AVAILABLE else json.dumps(payload)
 
         for attempt in range(self.config.max_retries):
             try:
                 response = self.session.post(
                     self._get_rpc_url(),
-                    json=payload,
+                    data=body,
                     timeout=self.config.request_timeout,
                     headers={"Content-Type": "application/json"}
                 )
                 response.raise_for_status()
-                result = response.json()
+                result = orjson.loads(response.content) if ORJSON_AVAILABLE else response.json()
 
                 if "error" in result:
                     console.print(f"[red]RPC error: {result['error']}[/red]")
@@ -247,7 +281,7 @@ class SolanaRPCClient:
 
                 return result.get("result")
 
-            except requests.exceptions.RequestException as e:
+            except (requests.exceptions.RequestException, ValueError) as e:
                 console.print(f"[yellow]RPC request failed (attempt {attempt + 1}): {e}[/yellow]")
                 if attempt < self.config.max_retries - 1:
                     self._rotate_rpc()
@@ -332,6 +366,7 @@ class SignalDetector:
         self.config = config
         self.cex_addresses = cex_addresses
         self.daily_signals: List[Signal] = []
+        self._decimals_divisor = 10 ** config.token_decimals
 
     def detect_balance_change(
         self,
@@ -395,8 +430,7 @@ class SignalDetector:
             return None
 
         # Calculate new supply percentage
-        decimals = self.config.token_decimals
-        display_balance = new_balance / (10 ** decimals)
+        display_balance = new_balance / self._decimals_divisor
         new_pct_supply = (display_balance / self.config.total_supply) * 100
 
         # Determine signal type with graduated severity
@@ -585,6 +619,8 @@ class SignalDetector:
 class TrackerLogger:
     """Handles logging to file and console."""
 
+    DECIMALS_DIVISOR = 10 ** 6  # RALPH decimals
+
     def __init__(self, log_file: str):
         self.log_file = log_file
         self.log_dir = Path(log_file).parent
@@ -593,8 +629,7 @@ class TrackerLogger:
 
     def log_poll(self, wallet_state: WalletState, change_type: str = "NO_CHANGE"):
         """Log a poll result."""
-        decimals = 6  # RALPH decimals
-        display_balance = wallet_state.balance_ralph / (10 ** decimals)
+        display_balance = wallet_state.balance_ralph / self.DECIMALS_DIVISOR
 
         line = (
             f"{datetime.utcnow().isoformat()}Z|INFO|POLL|"
@@ -657,6 +692,7 @@ class EmailNotifier:
     def __init__(self, config: EmailConfig, token_decimals: int = 6):
         self.config = config
         self.decimals = token_decimals
+        self._decimals_divisor = 10 ** token_decimals
         self.last_email_time: Optional[datetime] = None
 
     def is_enabled(self) -> bool:
@@ -681,7 +717,7 @@ class EmailNotifier:
 
     def format_balance(self, raw_balance: int) -> str:
         """Format token balance for display."""
-        balance = raw_balance / (10 ** self.decimals)
+        balance = raw_balance / self._decimals_divisor
         if balance >= 1_000_000:
             return f"{balance/1_000_000:.1f}M"
         elif balance >= 1_000:
@@ -859,7 +895,7 @@ class EmailNotifier:
             """
 
             for sig in recent_signals[:10]:  # Show last 10
-                sig_class = "buy" if "BUY" in sig.signal_type else "sell" if "SELL" in sig.signal_type else ""
+                sig_class = sig.direction.lower()
                 amount_str = self.format_balance(sig.amount) if sig.amount else "-"
                 ts = sig.timestamp[:16] if sig.timestamp else "-"
 
@@ -1238,10 +1274,11 @@ class CLIFormatter:
 
     def __init__(self, token_decimals: int = 6):
         self.decimals = token_decimals
+        self._decimals_divisor = 10 ** token_decimals
 
     def format_balance(self, raw_balance: int) -> str:
         """Format token balance for display."""
-        balance = raw_balance / (10 ** self.decimals)
+        balance = raw_balance / self._decimals_divisor
         if balance >= 1_000_000:
             return f"{balance/1_000_000:.1f}M"
         elif balance >= 1_000:
@@ -1401,10 +1438,16 @@ class CLIFormatter:
 class RalphWhaleTracker:
     """Main whale tracker class."""
 
+    # Max concurrent wallet RPCs per poll (kept low for public RPC rate limits)
+    RPC_WORKERS = 8
+
     def __init__(self, config_path: str = "ralph_config.yaml"):
         self.config = load_config(config_path)
         self.config_path = config_path
+        # Raw balance -> % of supply, computed once instead of per wallet per poll
+        self._pct_factor = 100.0 / (10 ** self.config.token_decimals * self.config.total_supply)
         self.rpc = SolanaRPCClient(self.config)
+        self._rpc_pool = ThreadPoolExecutor(max_workers=self.RPC_WORKERS, thread_name_prefix="ralph-rpc")
         self.formatter = CLIFormatter(self.config.token_decimals)
         self.logger = TrackerLogger(self.config.log_file)
 
@@ -1444,11 +1487,24 @@ class RalphWhaleTracker:
                 )
 
     def fetch_balances(self) -> Dict[str, int]:
-        """Fetch current RALPH balances for all tracked wallets."""
+        """Fetch current RALPH balances for all tracked wallets.
+
+        Wallet RPCs are independent, so they are dispatched concurrently and a
+        poll costs roughly the slowest single call instead of the sum of all.
+        """
+        futures = {
+            addr: self._rpc_pool.submit(self.rpc.get_token_balance, addr, self.config.token_address)
+            for addr in self.wallet_states
+        }
         balances = {}
 
-        for addr in self.wallet_states:
-            balance = self.rpc.get_token_balance(addr, self.config.token_address)
+        for addr, future in futures.items():
+            try:
+                balance = future.result()
+            except Exception as e:
+                console.print(f"[yellow]Balance fetch error for {addr}: {e}[/yellow]")
+                balance = None
+
             if balance is not None:
                 balances[addr] = balance
             else:
@@ -1460,6 +1516,18 @@ class RalphWhaleTracker:
     def update_and_detect(self, new_balances: Dict[str, int]) -> List[Signal]:
         """Update wallet states and detect signals."""
         signals = []
+        state_changed = False
+
+        # Signature lookups are I/O: fetch them concurrently up front so the
+        # detection loop below is pure CPU and never stalls on an RPC. Only
+        # whale wallets whose balance moved need one; pools never use them.
+        sig_futures = {
+            addr: self._rpc_pool.submit(self.rpc.get_signatures_for_address, addr, 5)
+            for addr, new_balance in new_balances.items()
+            if addr in self.wallet_states
+            and not self.wallet_states[addr].is_pool
+            and new_balance != self.wallet_states[addr].balance_ralph
+        }
 
         for addr, new_balance in new_balances.items():
             if addr not in self.wallet_states:
@@ -1468,7 +1536,12 @@ class RalphWhaleTracker:
             ws = self.wallet_states[addr]
 
             # Get recent transactions for context
-            recent_sigs = self.rpc.get_signatures_for_address(addr, limit=5)
+            recent_sigs = None
+            if addr in sig_futures:
+                try:
+                    recent_sigs = sig_futures[addr].result()
+                except Exception:
+                    pass
 
             # Detect balance change
             if ws.is_pool:
@@ -1483,12 +1556,14 @@ class RalphWhaleTracker:
                 self.logger.log_poll(ws)
 
             # Update state
+            if signal or new_balance != ws.balance_ralph or ws.balance_ralph_prev != ws.balance_ralph:
+                state_changed = True
             ws.balance_ralph_prev = ws.balance_ralph
             ws.balance_ralph = new_balance
-            ws.pct_supply = (new_balance / (10 ** self.config.token_decimals)) / self.config.total_supply * 100
+            ws.pct_supply = new_balance * self._pct_factor
 
             if signal:
-                ws.last_tx_type = "BUY" if "BUY" in signal.signal_type else "SELL" if "SELL" in signal.signal_type else ""
+                ws.last_tx_type = signal.direction
                 ws.last_tx_amount = signal.amount
                 ws.last_tx_time = signal.timestamp
                 ws.last_tx_sig = signal.tx_signature
@@ -1497,8 +1572,10 @@ class RalphWhaleTracker:
         coordinated = self.detector.detect_coordinated_activity()
         signals.extend(coordinated)
 
-        # Save state
-        save_state(self.wallet_states, self.config.state_file)
+        # Save state only when a wallet changed; an unchanged poll (the common
+        # case) would just rewrite an identical file.
+        if state_changed:
+            save_state(self.wallet_states, self.config.state_file)
 
         return signals
 
@@ -1513,7 +1590,7 @@ class RalphWhaleTracker:
             if addr in self.wallet_states:
                 ws = self.wallet_states[addr]
                 ws.balance_ralph = balance
-                ws.pct_supply = (balance / (10 ** self.config.token_decimals)) / self.config.total_supply * 100
+                ws.pct_supply = balance * self._pct_factor
 
         self.formatter.print_snapshot_table(self.wallet_states)
         save_state(self.wallet_states, self.config.state_file)
@@ -1543,6 +1620,10 @@ class RalphWhaleTracker:
         poll_count = 0
         trend_record_interval = 5  # Record trend data every N polls
 
+        # Polls are scheduled against fixed deadlines so slow RPC rounds don't
+        # stretch the effective interval.
+        next_tick = time.monotonic()
+
         try:
             while True:
                 poll_count += 1
@@ -1586,17 +1667,28 @@ class RalphWhaleTracker:
                 if not passive_mode:
                     console.print("-" * 60)
 
-                # Wait for next poll
-                time.sleep(self.config.poll_interval)
+                # Wait for next poll; if we've fallen a full period behind,
+                # resync instead of firing back-to-back catch-up polls
+                next_tick += self.config.poll_interval
+                delay = next_tick - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_tick = time.monotonic()
 
         except KeyboardInterrupt:
             console.print("\n[yellow]Tracker stopped by user.[/yellow]")
             # Final trend data recording
             if record_trends:
                 self.record_trend_data()
+            if self.trend_tracker:
+                self.trend_tracker.db.flush()
             save_state(self.wallet_states, self.config.state_file)
             if passive_mode:
                 console.print("[cyan]Data saved. Run --analyze N to analyze collected data.[/cyan]")
+        finally:
+            # Idle RPC workers would otherwise outlive the loop
+            self._rpc_pool.shutdown(wait=False)
 
     def show_history(self, hours: int = 24):
         """Show historical signals."""
@@ -1619,9 +1711,7 @@ class RalphWhaleTracker:
         balance = self.rpc.get_token_balance(address, self.config.token_address)
         if balance is not None:
             self.wallet_states[address].balance_ralph = balance
-            self.wallet_states[address].pct_supply = (
-                (balance / (10 ** self.config.token_decimals)) / self.config.total_supply * 100
-            )
+            self.wallet_states[address].pct_supply = balance * self._pct_factor
 
         save_state(self.wallet_states, self.config.state_file)
         console.print(f"[green]Added wallet: {label} ({address})[/green]")
@@ -1641,7 +1731,7 @@ class RalphWhaleTracker:
             if addr in self.wallet_states:
                 ws = self.wallet_states[addr]
                 ws.balance_ralph = balance
-                ws.pct_supply = (balance / (10 ** self.config.token_decimals)) / self.config.total_supply * 100
+                ws.pct_supply = balance * self._pct_factor
 
         save_state(self.wallet_states, self.config.state_file)
 
@@ -1654,13 +1744,11 @@ class RalphWhaleTracker:
             return
 
         try:
-            # Record wallet snapshots
-            self.trend_tracker.record_snapshot(self.wallet_states)
+            # Record wallet snapshots and pool liquidity in one transaction
+            self.trend_tracker.record_snapshot(self.wallet_states, include_liquidity=True)
 
-            # Record liquidity for pool wallets
-            for addr, ws in self.wallet_states.items():
-                if ws.is_pool:
-                    self.trend_tracker.record_liquidity(addr, ws.balance_ralph)
+            # Daily retention pass (settings.trend_retention_days) and ANALYZE
+            self.trend_tracker.run_maintenance_if_due()
 
         except Exception as e:
             console.print(f"[dim]Trend recording error: {e}[/dim]")
@@ -1729,7 +1817,7 @@ class RalphWhaleTracker:
             console.print("[dim]Trend analysis not available[/dim]")
             return
 
-        scores = self.trend_tracker.get_trend_history(1)
+        scores = self.trend_tracker.get_trend_history(1, limit=1)
         if scores:
             latest = scores[0]
             SIGNAL_COLORS = {
@@ -1757,41 +1845,16 @@ class RalphWhaleTracker:
         console.print(f"[cyan]║        WHALE BEHAVIOR ANALYSIS ({days} DAYS)                  ║[/cyan]")
         console.print(f"[cyan]╚═══════════════════════════════════════════════════════════╝[/cyan]\n")
 
-        # Get wallet history from database
-        db = self.trend_tracker.db
-        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-        cutoff_str = cutoff.strftime("%Y-%m-%d %H:%M:%S")
-
-        # Query wallet history
-        cursor = db.conn.execute("""
-            SELECT wallet, label, balance, pct_supply, tx_type, tx_amount, timestamp
-            FROM wallet_history
-            WHERE timestamp >= ?
-            ORDER BY wallet, timestamp
-        """, (cutoff_str,))
-        rows = cursor.fetchall()
-
-        if not rows:
+        # Per-wallet start/end balances and counts, reduced inside SQLite
+        summaries = self.trend_tracker.db.get_wallet_window_summaries(days)
+        total_rows = sum(summary[3] for summary in summaries.values())
+
+        if not total_rows:
             console.print(f"[yellow]No data found for the last {days} days.[/yellow]")
             console.print("[dim]Run the tracker in passive mode to collect data first.[/dim]")
             return
 
-        # Organize by wallet
-        wallet_data: Dict[str, List] = {}
-        for row in rows:
-            wallet = row[0]
-            if wallet not in wallet_data:
-                wallet_data[wallet] = []
-            wallet_data[wallet].append({
-                "label": row[1],
-                "balance": row[2],
-                "pct_supply": row[3],
-                "tx_type": row[4],
-                "tx_amount": row[5],
-                "timestamp": row[6]
-            })
-
-        console.print(f"[green]Found {len(rows)} data points across {len(wallet_data)} wallets[/green]\n")
+        console.print(f"[green]Found {total_rows} data points across {len(summaries)} wallets[/green]\n")
 
         # Analyze each whale
         from rich.table import Table
@@ -1804,19 +1867,14 @@ class RalphWhaleTracker:
         table.add_column("Behavior", style="bold")
 
         total_net_flow = 0
-        for wallet, history in wallet_data.items():
-            if len(history) < 2:
+        scale = 10 ** self.config.token_decimals  # Raw units per token
+        for wallet, (label, start_balance, end_balance, row_count, tx_count) in summaries.items():
+            if row_count < 2:
                 continue
 
-            label = history[0]["label"]
-            start_balance = history[0]["balance"]
-            end_balance = history[-1]["balance"]
             net_change = end_balance - start_balance
             total_net_flow += net_change
 
-            # Count transactions
-            tx_count = sum(1 for h in history if h["tx_type"])
-
             # Classify behavior
             if net_change > 0:
                 pct_change = (net_change / start_balance * 100) if start_balance > 0 else 100
@@ -1834,10 +1892,9 @@ class RalphWhaleTracker:
                 behavior = "[yellow]HOLDING[/yellow]"
 
             # Format balances for display
-            decimals = self.config.token_decimals
-            start_fmt = f"{start_balance / 10**decimals:,.0f}"
-            end_fmt = f"{end_balance / 10**decimals:,.0f}"
-            net_fmt = f"{net_change / 10**decimals:+,.0f}"
+            start_fmt = f"{start_balance / scale:,.0f}"
+            end_fmt = f"{end_balance / scale:,.0f}"
+            net_fmt = f"{net_change / scale:+,.0f}"
 
             table.add_row(label, start_fmt, end_fmt, net_fmt, str(tx_count), behavior)
 
@@ -1845,11 +1902,10 @@ class RalphWhaleTracker:
 
         # Overall summary
         console.print(f"\n[bold]Overall Market Phase:[/bold]")
-        decimals = self.config.token_decimals
         if total_net_flow > 0:
-            console.print(f"  [green]ACCUMULATION[/green] - Net inflow: {total_net_flow / 10**decimals:,.0f} tokens")
+            console.print(f"  [green]ACCUMULATION[/green] - Net inflow: {total_net_flow / scale:,.0f} tokens")
         elif total_net_flow < 0:
-            console.print(f"  [red]DISTRIBUTION[/red] - Net outflow: {abs(total_net_flow) / 10**decimals:,.0f} tokens")
+            console.print(f"  [red]DISTRIBUTION[/red] - Net outflow: {abs(total_net_flow) / scale:,.0f} tokens")
         else:
             console.print(f"  [yellow]NEUTRAL[/yellow] - No significant net flow")
 
@@ -1857,22 +1913,28 @@ class RalphWhaleTracker:
         console.print(f"\n[bold]Trend Score History:[/bold]")
         scores = self.trend_tracker.get_trend_history(days)
         if scores:
-            bullish_count = sum(1 for s in scores if "BULLISH" in s.signal.value)
-            bearish_count = sum(1 for s in scores if "BEARISH" in s.signal.value)
-            neutral_count = sum(1 for s in scores if s.signal.value == "NEUTRAL")
+            # Tally signals and total the scores in one pass
+            signal_counts: Dict[Any, int] = dict.fromkeys(TrendSignal, 0)
+            score_total = 0
+            for s in scores:
+                signal_counts[s.signal] += 1
+                score_total += s.score
+            bullish_count = signal_counts[TrendSignal.STRONG_BULLISH] + signal_counts[TrendSignal.BULLISH]
+            bearish_count = signal_counts[TrendSignal.STRONG_BEARISH] + signal_counts[TrendSignal.BEARISH]
+            neutral_count = signal_counts[TrendSignal.NEUTRAL]
             console.print(f"  Bullish signals: {bullish_count}")
             console.print(f"  Bearish signals: {bearish_count}")
             console.print(f"  Neutral signals: {neutral_count}")
 
-            avg_score = sum(s.score for s in scores) / len(scores)
+            avg_score = score_total / len(scores)
             console.print(f"  Average score: {avg_score:+.1f}")
         else:
             console.print("  [dim]No trend scores recorded[/dim]")
 
         # Data quality assessment
         console.print(f"\n[bold]Data Quality:[/bold]")
-        total_polls = len(rows)
-        expected_polls = days * 24 * 12 * len(wallet_data)  # 5-min intervals
+        total_polls = total_rows
+        expected_polls = days * 24 * 12 * len(summaries)  # 5-min intervals
         coverage = (total_polls / expected_polls * 100) if expected_polls > 0 else 0
         console.print(f"  Data coverage: {coverage:.1f}% ({total_polls} of ~{expected_polls} expected polls)")
 
@@ -1896,20 +1958,20 @@ class RalphWhaleTracker:
         if self.trend_tracker:
             # Run full discovery cycle to get all data
             try:
-                discovery_data = self.trend_tracker.run_full_discovery_cycle(self.wallet_states)
+                # Unnotified whales are claimed (read and marked notified) atomically
+                discovery_data = self.trend_tracker.run_full_discovery_cycle(
+                    self.wallet_states, claim_whales=True
+                )
                 trend_score = discovery_data.get("trend_score")
                 holder_summary = discovery_data.get("holder_summary")
                 new_whales = discovery_data.get("unnotified_whales", [])
-                
-                # Mark whales as notified after including in email
+
                 if new_whales:
-                    whale_addresses = [w.get("address") for w in new_whales if w.get("address")]
-                    self.trend_tracker.mark_whales_notified(whale_addresses)
                     console.print(f"[green]Found {len(new_whales)} new whale(s) to report[/green]")
             except Exception as e:
                 console.print(f"[yellow]Discovery cycle error: {e}[/yellow]")
                 # Fallback to basic trend score
-                scores = self.trend_tracker.get_trend_history(1)
+                scores = self.trend_tracker.get_trend_history(1, limit=1)
                 if scores:
                     trend_score = scores[0]
 
@@ -13,22 +13,94 @@ Features:
 - Trend confidence scoring (BULLISH/BEARISH/NEUTRAL)
 """
 
+import atexit
+import calendar
+import heapq
 import sqlite3
 import json
 import os
+import queue
+import re
+import sys
+import threading
 import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, asdict
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple, Any
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
+from itertools import groupby
+from typing import AbstractSet, Dict, List, Mapping, Optional, Tuple, Any
 from enum import Enum
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Fast JSON for RPC payloads (optional)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
+from rich.text import Text
 from rich import box
 
-console = Console()
+# Colors come from explicit markup/styles; skipping rich's automatic regex
+# highlighting of numbers and strings roughly halves the cost of each print
+console = Console(highlight=False)
+
+# (connect, read) timeouts in seconds, so a slow endpoint fails fast and is
+# retried rather than stalling the whole poll.
+API_TIMEOUT = (2, 5)     # Jupiter / Birdeye price and overview calls
+RPC_TIMEOUT = (2, 10)    # Solana / Helius JSON-RPC calls
+RPC_SCAN_TIMEOUT = (2, 60)  # getProgramAccounts: the response lists every token account
+
+
+def make_http_session() -> requests.Session:
+    """Create a pooled session that retries transient HTTP failures."""
+    retry = Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=None,  # JSON-RPC POSTs here are read-only, safe to retry
+    )
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def encode_json(payload: Any) -> bytes:
+    """Serialize a request body or stored JSON column, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode("utf-8")
+
+
+def decode_json(content: bytes) -> Any:
+    """Parse a response body or stored JSON column, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def post_json_rpc(session: requests.Session, url: str, payload: Dict,
+                  timeout: Tuple[float, float] = RPC_TIMEOUT) -> Any:
+    """POST a JSON-RPC payload and return the decoded response."""
+    response = session.post(
+        url,
+        data=encode_json(payload),
+        timeout=timeout,
+        headers={"Content-Type": "application/json"}
+    )
+    response.raise_for_status()
+    return decode_json(response.content)
 
 
 # ============================================================
@@ -43,6 +115,14 @@ class TrendPhase(Enum):
     UNKNOWN = "UNKNOWN"                 # Insufficient data
 
 
+# Module-level aliases: a global load is much cheaper than Enum class
+# attribute access in the per-wallet analysis paths
+_ACCUMULATION = TrendPhase.ACCUMULATION
+_DISTRIBUTION = TrendPhase.DISTRIBUTION
+_CONSOLIDATION = TrendPhase.CONSOLIDATION
+_UNKNOWN = TrendPhase.UNKNOWN
+
+
 class TrendSignal(Enum):
     """Overall market trend signal."""
     STRONG_BULLISH = "STRONG_BULLISH"   # High confidence buy signal
@@ -51,8 +131,12 @@ class TrendSignal(Enum):
     BEARISH = "BEARISH"                  # Moderate sell signal
     STRONG_BEARISH = "STRONG_BEARISH"   # High confidence sell signal
 
+# slots=True needs Python 3.10; older interpreters keep a regular dataclass.
+# Used where fields have defaults, which rule out an explicit __slots__.
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_DATACLASS_SLOTS)
 class MarketMetrics:
     """Current market state metrics."""
     timestamp: str
@@ -69,6 +153,11 @@ class MarketMetrics:
 @dataclass
 class WhaleTrendMetrics:
     """Whale-specific trend metrics for a single wallet."""
+    # Explicit slots (no per-instance __dict__); slots=True needs Python 3.10
+    __slots__ = ("wallet", "label", "current_balance", "balance_7d_ago", "balance_change_7d",
+                 "balance_change_7d_pct", "buy_count_7d", "sell_count_7d", "net_flow_7d",
+                 "velocity", "phase")
+
     wallet: str
     label: str
     current_balance: int
@@ -85,6 +174,8 @@ class WhaleTrendMetrics:
 @dataclass
 class TrendScore:
     """Aggregated trend confidence score."""
+    __slots__ = ("signal", "score", "confidence", "whale_phase", "key_factors", "timestamp")
+
     signal: TrendSignal
     score: int  # -100 to +100
     confidence: float  # 0-1
@@ -93,21 +184,327 @@ class TrendScore:
     timestamp: str
 
 
+# (threshold, divisor, suffix) for compact token amounts, largest first
+_BALANCE_SCALES = ((1_000_000, 1_000_000, "M"), (1_000, 1_000, "K"))
+
+
+def _format_token_amount(balance: float) -> str:
+    """Format a whole-token amount compactly: 1.2M, 3.4K or 56."""
+    for threshold, divisor, suffix in _BALANCE_SCALES:
+        if balance >= threshold:
+            return f"{balance / divisor:.1f}{suffix}"
+    return f"{balance:.0f}"
+
+
 # ============================================================
 # SQLITE DATABASE MANAGER
 # ============================================================
 
+def _to_epoch(timestamp: str) -> int:
+    """Convert a naive-UTC ISO timestamp to unix seconds."""
+    return calendar.timegm(datetime.fromisoformat(timestamp.rstrip("Z")).timetuple())
+
+
+def _to_iso(epoch: int) -> str:
+    """Convert unix seconds back to the naive-UTC ISO form used in dataclasses."""
+    return datetime.fromtimestamp(epoch, timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def _trend_score_row(cursor: sqlite3.Cursor, row: Tuple) -> TrendScore:
+    """sqlite3 row factory building a TrendScore from a trend_scores row."""
+    return TrendScore(
+        signal=TrendSignal(row[0]),
+        score=row[1],
+        confidence=row[2],
+        whale_phase=TrendPhase(row[3]),
+        key_factors=decode_json(row[4]) if row[4] else [],
+        timestamp=_to_iso(row[5])
+    )
+
+
+# Converts a pre-migration ISO-text timestamp column to unix seconds; NULL
+# when the text does not parse
+_SQL_LEGACY_EPOCH = """
+    CASE typeof(timestamp) WHEN 'integer' THEN timestamp
+    ELSE CAST(strftime('%s', timestamp) AS INTEGER) END
+"""
+
+# Statements are kept as constants so every call hands sqlite3 the same
+# string and hits its per-connection prepared statement cache.
+_SQL_INSERT_WALLET_BALANCE = """
+    INSERT OR IGNORE INTO wallet_history
+    (wallet, label, balance, pct_supply, tx_type, tx_amount, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_MARKET_METRICS = """
+    INSERT INTO market_history
+    (price_usd, volume_24h, liquidity_usd, holder_count, market_cap, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+# Liquidity and holder snapshots take their timestamp from the column
+# default (strftime('%s', 'now')) when the writer commits them.
+_SQL_INSERT_LIQUIDITY = """
+    INSERT INTO liquidity_history
+    (pool_address, token_balance, sol_balance, depth_usd)
+    VALUES (?, ?, ?, ?)
+"""
+
+_SQL_INSERT_HOLDER_COUNT = """
+    INSERT INTO holder_snapshots (holder_count, top_10_pct, top_50_pct)
+    VALUES (?, ?, ?)
+"""
+
+_SQL_INSERT_TREND_SCORE = """
+    INSERT INTO trend_scores
+    (signal, score, confidence, whale_phase, key_factors, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_DISCOVERED_WHALE = """
+    INSERT OR IGNORE INTO discovered_whales
+    (address, token_account, balance, pct_supply, rank_when_discovered)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+_SQL_MARK_WHALE_NOTIFIED = "UPDATE discovered_whales SET notified = 1 WHERE address = ?"
+
+_SQL_WALLET_HISTORY = """
+    SELECT balance, pct_supply, tx_type, tx_amount, timestamp
+    FROM wallet_history
+    WHERE wallet = ? AND timestamp >= ?
+    ORDER BY timestamp ASC
+"""
+
+_SQL_ALL_WALLET_HISTORY = """
+    SELECT wallet, label, balance, pct_supply, tx_type, tx_amount, timestamp
+    FROM wallet_history
+    WHERE timestamp >= ?
+    ORDER BY wallet, timestamp ASC
+"""
+
+# One row per wallet: first balance in the window plus buy/sell tallies and
+# net flow. Partitioning by wallet in timestamp order follows idx_wh_wallet_ts.
+# {wallet_filter} is empty or an "AND wallet IN (...)" placeholder list.
+# Every snapshot repeats the sticky raw-unit tx_amount, so the integer SUM can
+# pass int64; SQLite then raises "integer overflow" and the caller falls back
+# to _SQL_WALLET_TREND_ROWS.
+_SQL_WALLET_TREND_AGGREGATES = """
+    SELECT wallet,
+           MAX(first_balance),
+           COUNT(CASE WHEN tx_type = 'BUY' THEN 1 END),
+           COUNT(CASE WHEN tx_type = 'SELL' THEN 1 END),
+           SUM(CASE tx_type WHEN 'BUY' THEN tx_amount WHEN 'SELL' THEN -tx_amount ELSE 0 END)
+    FROM (
+        SELECT wallet, tx_type, tx_amount,
+               FIRST_VALUE(balance) OVER (PARTITION BY wallet ORDER BY timestamp) AS first_balance
+        FROM wallet_history
+        WHERE timestamp >= ?{wallet_filter}
+    )
+    GROUP BY wallet
+"""
+
+# Rows behind _SQL_WALLET_TREND_AGGREGATES, reduced in Python (exact integers)
+# when the SQL sum overflows
+_SQL_WALLET_TREND_ROWS = """
+    SELECT wallet, balance, tx_type, tx_amount
+    FROM wallet_history
+    WHERE timestamp >= ?{wallet_filter}
+    ORDER BY wallet, timestamp ASC
+"""
+
+# Same reduction for a single wallet (same overflow fallback); the scalar
+# subquery and the aggregate both search idx_wh_wallet_ts.
+# COUNT(*) = 0 means no history in the window.
+_SQL_WALLET_TREND_AGGREGATE = """
+    SELECT (SELECT balance FROM wallet_history
+            WHERE wallet = ?1 AND timestamp >= ?2
+            ORDER BY timestamp LIMIT 1),
+           COUNT(CASE WHEN tx_type = 'BUY' THEN 1 END),
+           COUNT(CASE WHEN tx_type = 'SELL' THEN 1 END),
+           SUM(CASE tx_type WHEN 'BUY' THEN tx_amount WHEN 'SELL' THEN -tx_amount ELSE 0 END),
+           COUNT(*)
+    FROM wallet_history
+    WHERE wallet = ?1 AND timestamp >= ?2
+"""
+
+# Per-wallet window summary for the weekly report: label and balance at the
+# start of the window, balance at the end, row count and rows carrying a tx.
+_SQL_WALLET_WINDOW_SUMMARIES = """
+    SELECT wallet, MAX(first_label), MAX(first_balance), MAX(last_balance),
+           COUNT(*), COUNT(CASE WHEN tx_type <> '' THEN 1 END)
+    FROM (
+        SELECT wallet, tx_type,
+               FIRST_VALUE(label) OVER by_time AS first_label,
+               FIRST_VALUE(balance) OVER by_time AS first_balance,
+               LAST_VALUE(balance) OVER (
+                   by_time ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+               ) AS last_balance
+        FROM wallet_history
+        WHERE timestamp >= ?
+        WINDOW by_time AS (PARTITION BY wallet ORDER BY timestamp)
+    )
+    GROUP BY wallet
+    ORDER BY wallet
+"""
+
+_SQL_LIQUIDITY_HISTORY = """
+    SELECT token_balance, sol_balance, depth_usd, timestamp
+    FROM liquidity_history
+    WHERE timestamp >= ?
+    ORDER BY timestamp ASC
+"""
+
+_SQL_HOLDER_HISTORY = """
+    SELECT holder_count, top_10_pct, top_50_pct, timestamp
+    FROM holder_snapshots
+    WHERE timestamp >= ?
+    ORDER BY timestamp ASC
+"""
+
+_SQL_MARKET_HISTORY = """
+    SELECT price_usd, volume_24h, liquidity_usd, holder_count, market_cap, timestamp
+    FROM market_history
+    WHERE timestamp >= ?
+    ORDER BY timestamp ASC
+"""
+
+_SQL_TREND_SCORE_HISTORY = """
+    SELECT signal, score, confidence, whale_phase, key_factors, timestamp
+    FROM trend_scores
+    WHERE timestamp >= ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+"""
+
+_SQL_UNNOTIFIED_WHALES = """
+    SELECT address, token_account, balance, pct_supply, rank_when_discovered, discovered_at
+    FROM discovered_whales
+    WHERE notified = 0
+    ORDER BY pct_supply DESC
+"""
+
+# Atomically flag every unnotified whale and return it (SQLite 3.35+)
+_SQL_CLAIM_UNNOTIFIED_WHALES = """
+    UPDATE discovered_whales SET notified = 1
+    WHERE notified = 0
+    RETURNING address, token_account, balance, pct_supply, rank_when_discovered, discovered_at
+"""
+
+_SQL_ALL_DISCOVERED_WHALES = """
+    SELECT address, token_account, balance, pct_supply, rank_when_discovered,
+           discovered_at, notified, added_to_tracking
+    FROM discovered_whales
+    ORDER BY pct_supply DESC
+"""
+
+_SQL_LATEST_HOLDER_SNAPSHOT = """
+    SELECT holder_count, top_10_pct, top_50_pct, timestamp
+    FROM holder_snapshots
+    ORDER BY timestamp DESC
+    LIMIT 1
+"""
+
+# Retention: market rows older than the raw window are folded into hourly
+# averages before the raw rows are deleted. The cutoff is hour-aligned, so
+# every rolled-up hour is complete.
+_SQL_ROLLUP_MARKET_HOURLY = """
+    INSERT OR REPLACE INTO market_history_hourly
+    (hour, price_usd, volume_24h, liquidity_usd, holder_count, market_cap, samples)
+    SELECT timestamp / 3600 * 3600, AVG(price_usd), AVG(volume_24h), AVG(liquidity_usd),
+           CAST(AVG(holder_count) AS INTEGER), AVG(market_cap), COUNT(*)
+    FROM market_history
+    WHERE timestamp < ?
+    GROUP BY timestamp / 3600
+"""
+
+_SQL_PRUNE_MARKET_HOURLY = "DELETE FROM market_history_hourly WHERE hour < ?"
+
+_SQL_PRUNE_RAW_HISTORY = tuple(
+    f"DELETE FROM {table} WHERE timestamp < ?"
+    for table in ("wallet_history", "market_history", "liquidity_history", "holder_snapshots")
+)
+
+
 class TrendDatabase:
-    """SQLite database for storing historical trend data."""
+    """SQLite database for storing historical trend data.
+
+    Snapshot writes (wallet, market, liquidity, holder, trend score) are
+    queued and committed in batches by a background writer thread, so the
+    polling loop never waits on disk. Reads flush the queue first, so
+    callers always see their own writes. Reads and the few synchronous
+    writes share one long-lived connection, so SQLite's statement cache is
+    reused across calls and no call pays for opening the file.
+
+    Call close() (or use the database as a context manager) when done; an
+    exit hook only covers databases still open at interpreter shutdown.
+    """
+
+    WRITE_BATCH_SIZE = 500  # Max queued rows committed per transaction
+
+    # Applied to every connection. The database itself is switched to WAL
+    # once in _init_database (journal_mode persists in the file), so commits
+    # append to the log instead of rewriting pages through a rollback journal.
+    # sqlite3.connect's default 5s timeout already sets busy_timeout.
+    CONNECTION_PRAGMAS = (
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-131072",  # 128 MiB page cache (upper bound, grows on demand)
+        "PRAGMA mmap_size=268435456",  # 256 MiB memory-mapped reads
+    )
 
-    def __init__(self, db_path: str = "ralph_trends.db"):
+    # Prepared statements kept per connection (sqlite3 default is 128). Every
+    # query is a module-level _SQL_* constant, so repeat calls hit this cache.
+    STATEMENT_CACHE_SIZE = 256
+
+    # Tables whose timestamp column holds INTEGER unix seconds (UTC)
+    TIMESTAMPED_TABLES = ("wallet_history", "market_history", "liquidity_history",
+                          "trend_scores", "holder_snapshots")
+
+    def __init__(self, db_path: str = "ralph_trends.db", background_writes: bool = True):
         self.db_path = db_path
         self._init_database()
 
+        self._conn = self._connect(check_same_thread=False)
+        self._conn_lock = threading.Lock()
+
+        # Items are groups of (sql, [params, ...]) writes; a group always lands
+        # in one transaction
+        self._write_queue: "queue.Queue[Optional[Tuple[Tuple[str, List[tuple]], ...]]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        if background_writes:
+            self._writer = threading.Thread(
+                target=self._writer_loop, name="trend-db-writer", daemon=True
+            )
+            self._writer.start()
+            # Unregistered by close(), so closed databases are not kept alive
+            atexit.register(self.close)
+
+    def __enter__(self) -> "TrendDatabase":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _connect(self, **kwargs) -> sqlite3.Connection:
+        """Open a connection to the trend database with CONNECTION_PRAGMAS applied."""
+        kwargs.setdefault("cached_statements", self.STATEMENT_CACHE_SIZE)
+        conn = sqlite3.connect(self.db_path, **kwargs)
+        for pragma in self.CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
     def _init_database(self):
         """Initialize database tables."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect(isolation_level=None)
         cursor = conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")  # Must run outside a transaction
+        cursor.execute("BEGIN")
+
+        # Databases from before timestamps moved to INTEGER epoch seconds are
+        # rebuilt: set the old tables aside, create the new ones, copy rows.
+        legacy_tables = self._set_aside_text_timestamp_tables(cursor)
 
         # Wallet balance history
         cursor.execute("""
@@ -119,7 +516,7 @@ class TrendDatabase:
                 pct_supply REAL NOT NULL,
                 tx_type TEXT,
                 tx_amount INTEGER DEFAULT 0,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                timestamp INTEGER NOT NULL DEFAULT (strftime('%s', 'now')),
                 UNIQUE(wallet, timestamp)
             )
         """)
@@ -133,7 +530,7 @@ class TrendDatabase:
                 liquidity_usd REAL,
                 holder_count INTEGER,
                 market_cap REAL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                timestamp INTEGER NOT NULL DEFAULT (strftime('%s', 'now'))
             )
         """)
 
@@ -145,7 +542,7 @@ class TrendDatabase:
                 token_balance INTEGER NOT NULL,
                 sol_balance INTEGER,
                 depth_usd REAL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                timestamp INTEGER NOT NULL DEFAULT (strftime('%s', 'now'))
             )
         """)
 
@@ -158,7 +555,7 @@ class TrendDatabase:
                 confidence REAL NOT NULL,
                 whale_phase TEXT NOT NULL,
                 key_factors TEXT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                timestamp INTEGER NOT NULL DEFAULT (strftime('%s', 'now'))
             )
         """)
 
@@ -169,7 +566,7 @@ class TrendDatabase:
                 holder_count INTEGER NOT NULL,
                 top_10_pct REAL,
                 top_50_pct REAL,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+                timestamp INTEGER NOT NULL DEFAULT (strftime('%s', 'now'))
             )
         """)
 
@@ -188,292 +585,410 @@ class TrendDatabase:
             )
         """)
 
-        # Create indexes for faster queries
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_wallet_history_wallet ON wallet_history(wallet)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_wallet_history_timestamp ON wallet_history(timestamp)")
+        # Hourly market averages kept after raw rows age out (see prune_history)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS market_history_hourly (
+                hour INTEGER PRIMARY KEY,
+                price_usd REAL,
+                volume_24h REAL,
+                liquidity_usd REAL,
+                holder_count INTEGER,
+                market_cap REAL,
+                samples INTEGER NOT NULL
+            )
+        """)
+
+        for table in legacy_tables:
+            self._copy_legacy_rows(cursor, table)
+
+        # Create indexes for faster queries. idx_wh_wallet_ts covers every
+        # column get_wallet_history reads, so per-wallet range scans never
+        # touch the table; it supersedes the old single-column indexes.
+        cursor.execute("DROP INDEX IF EXISTS idx_wallet_history_wallet")
+        cursor.execute("DROP INDEX IF EXISTS idx_wallet_history_timestamp")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_wh_wallet_ts
+            ON wallet_history(wallet, timestamp, balance, pct_supply, tx_type, tx_amount)
+        """)
+        # Time-range reads and the latest-row lookups (ORDER BY timestamp DESC
+        # LIMIT n) walk these from either end; an ascending index serves both.
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_market_history_timestamp ON market_history(timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_liquidity_history_timestamp ON liquidity_history(timestamp)")
+        # Holder reads only need these four columns, so the index covers them
+        cursor.execute("DROP INDEX IF EXISTS idx_holder_snapshots_timestamp")
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_holder_snapshots_ts_covering
+            ON holder_snapshots(timestamp, holder_count, top_10_pct, top_50_pct)
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_trend_scores_timestamp ON trend_scores(timestamp)")
+        # discovered_whales is never pruned, but only the few unnotified rows
+        # are read each report; a partial index keeps that lookup (and its
+        # pct_supply ordering) independent of the table's size
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_discovered_whales_unnotified
+            ON discovered_whales(pct_supply DESC) WHERE notified = 0
+        """)
 
-        conn.commit()
+        cursor.execute("COMMIT")
         conn.close()
 
+    def _set_aside_text_timestamp_tables(self, cursor) -> List[str]:
+        """Rename tables still storing ISO-text timestamps to <table>_legacy."""
+        legacy = []
+        for table in self.TIMESTAMPED_TABLES:
+            columns = cursor.execute(f"PRAGMA table_info({table})").fetchall()
+            ts_type = next((col[2] for col in columns if col[1] == "timestamp"), None)
+            if ts_type is not None and ts_type.upper() != "INTEGER":
+                cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_legacy")
+                legacy.append(table)
+        return legacy
+
+    def _copy_legacy_rows(self, cursor, table: str):
+        """Copy rows from <table>_legacy, converting timestamps to epoch seconds.
+
+        Rows whose timestamp does not parse are dropped (and counted) rather
+        than given a made-up time that would land them in every recent window.
+        """
+        columns = [col[1] for col in cursor.execute(f"PRAGMA table_info({table}_legacy)")]
+        select = ", ".join(_SQL_LEGACY_EPOCH if col == "timestamp" else col for col in columns)
+        unparseable = cursor.execute(
+            f"SELECT COUNT(*) FROM {table}_legacy WHERE ({_SQL_LEGACY_EPOCH}) IS NULL").fetchone()[0]
+        cursor.execute(f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) "
+                       f"SELECT {select} FROM {table}_legacy WHERE ({_SQL_LEGACY_EPOCH}) IS NOT NULL")
+        cursor.execute(f"DROP TABLE {table}_legacy")
+        if unparseable:
+            console.print(f"[yellow]Dropped {unparseable} {table} rows with unparseable "
+                          f"timestamps during migration[/yellow]")
+
+    def _writer_loop(self):
+        """Drain the write queue, committing each batch in one transaction."""
+        conn = self._connect()
+        running = True
+
+        while running:
+            batch = [self._write_queue.get()]
+            while len(batch) < self.WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            groups = [item for item in batch if item is not None]
+            running = len(groups) == len(batch)  # None is the stop sentinel
+
+            try:
+                self._commit_groups(conn, groups)
+            except Exception:
+                conn.rollback()
+                # Replay group by group so a bad group (SQL error or malformed
+                # rows) only loses its own writes and never kills this thread
+                for group in groups:
+                    try:
+                        self._commit_groups(conn, (group,))
+                    except Exception as e:
+                        conn.rollback()
+                        console.print(f"[dim]Trend DB write error: {e}[/dim]")
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+
+        conn.close()
+
+    @staticmethod
+    def _commit_groups(conn: sqlite3.Connection, groups) -> None:
+        """Run queued write groups in one transaction and commit it."""
+        writes = [write for group in groups for write in group]
+        for sql, same_sql in groupby(writes, key=lambda write: write[0]):
+            conn.executemany(sql, [params for _, rows in same_sql for params in rows])
+        conn.commit()
+
+    def _write(self, sql: str, params: tuple):
+        """Queue a write for the background writer (or run it inline)."""
+        self._write_group(((sql, [params]),))
+
+    def _write_many(self, sql: str, rows: List[tuple]):
+        """Queue several writes of one statement as a single item (or run them inline)."""
+        self._write_group(((sql, rows),))
+
+    def _write_group(self, writes: Tuple[Tuple[str, List[tuple]], ...]):
+        """Queue (sql, rows) writes that must commit together (or run them inline)."""
+        if self._writer is not None:
+            self._write_queue.put_nowait(writes)
+            return
+
+        with self._conn_lock, self._conn:
+            for sql, rows in writes:
+                self._conn.executemany(sql, rows)
+
+    def _execute_write(self, sql: str, rows: List[tuple]):
+        """Run a write synchronously on the shared connection in one transaction."""
+        with self._conn_lock, self._conn:
+            self._conn.executemany(sql, rows)
+
+    def _query(self, sql: str, params: tuple = (), row_factory=None) -> List[Any]:
+        """Run a read on the shared connection after flushing pending writes.
+
+        ``row_factory`` applies to this query's cursor only.
+        """
+        self.flush()
+        with self._conn_lock:
+            cursor = self._conn.cursor()
+            cursor.row_factory = row_factory
+            return cursor.execute(sql, params).fetchall()
+
+    def flush(self):
+        """Block until every queued write has been committed."""
+        if self._writer is not None and self._writer.is_alive():
+            self._write_queue.join()
+
+    def close(self):
+        """Flush pending writes, stop the background writer and refresh planner stats."""
+        if self._writer is not None and self._writer.is_alive():
+            self._write_queue.put(None)
+            self._writer.join()
+        self._writer = None
+        atexit.unregister(self.close)
+
+        # Cheap: only re-analyzes tables whose stats the session's queries found stale
+        with self._conn_lock:
+            self._conn.execute("PRAGMA optimize")
+
+    def analyze(self):
+        """Rebuild query planner statistics for all tables (run periodically)."""
+        self.flush()
+        with self._conn_lock:
+            self._conn.execute("ANALYZE")
+
     def record_wallet_balance(self, wallet: str, label: str, balance: int,
                               pct_supply: float, tx_type: str = None, tx_amount: int = 0):
         """Record a wallet balance snapshot."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self._write(_SQL_INSERT_WALLET_BALANCE,
+                    (wallet, label, balance, pct_supply, tx_type, tx_amount, int(time.time())))
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO wallet_history
-            (wallet, label, balance, pct_supply, tx_type, tx_amount, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (wallet, label, balance, pct_supply, tx_type, tx_amount,
-              datetime.utcnow().isoformat()))
+    def record_wallet_balances(self, rows: List[Tuple[str, str, int, float, Optional[str], int]]):
+        """Record (wallet, label, balance, pct_supply, tx_type, tx_amount) snapshots together.
 
-        conn.commit()
-        conn.close()
+        All rows share one timestamp and are queued as one item, so the whole
+        polling cycle's snapshot is committed in a single transaction.
+        """
+        self.record_polling_cycle(rows)
 
-    def record_market_metrics(self, metrics: MarketMetrics):
-        """Record market metrics snapshot."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def record_polling_cycle(self, wallet_rows: List[Tuple[str, str, int, float, Optional[str], int]],
+                             liquidity_rows: List[Tuple[str, int, int, float]] = ()):
+        """Record one polling cycle's wallet and pool snapshots in a single transaction.
 
-        cursor.execute("""
-            INSERT INTO market_history
-            (price_usd, volume_24h, liquidity_usd, holder_count, market_cap, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (metrics.price_usd, metrics.volume_24h, metrics.liquidity_usd,
-              metrics.holder_count, metrics.market_cap, metrics.timestamp))
+        ``liquidity_rows`` are (pool_address, token_balance, sol_balance, depth_usd).
+        """
+        now = int(time.time())
+        writes = [(_SQL_INSERT_WALLET_BALANCE, [(*row, now) for row in wallet_rows])]
+        if liquidity_rows:
+            writes.append((_SQL_INSERT_LIQUIDITY, list(liquidity_rows)))
+        self._write_group(tuple(writes))
 
-        conn.commit()
-        conn.close()
+    def record_market_metrics(self, metrics: MarketMetrics):
+        """Record market metrics snapshot."""
+        self._write(_SQL_INSERT_MARKET_METRICS,
+                    (metrics.price_usd, metrics.volume_24h, metrics.liquidity_usd,
+                     metrics.holder_count, metrics.market_cap, _to_epoch(metrics.timestamp)))
+
+    def record_market_snapshot(self, metrics: MarketMetrics, holder_count: Optional[int] = None,
+                               top_10_pct: float = 0.0, top_50_pct: float = 0.0):
+        """Record market metrics and, optionally, a holder snapshot in one transaction."""
+        writes = [(_SQL_INSERT_MARKET_METRICS,
+                   [(metrics.price_usd, metrics.volume_24h, metrics.liquidity_usd,
+                     metrics.holder_count, metrics.market_cap, _to_epoch(metrics.timestamp))])]
+        if holder_count is not None:
+            writes.append((_SQL_INSERT_HOLDER_COUNT, [(holder_count, top_10_pct, top_50_pct)]))
+        self._write_group(tuple(writes))
 
     def record_liquidity(self, pool_address: str, token_balance: int,
                          sol_balance: int = 0, depth_usd: float = 0.0):
         """Record liquidity pool snapshot."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            INSERT INTO liquidity_history
-            (pool_address, token_balance, sol_balance, depth_usd, timestamp)
-            VALUES (?, ?, ?, ?, ?)
-        """, (pool_address, token_balance, sol_balance, depth_usd,
-              datetime.utcnow().isoformat()))
-
-        conn.commit()
-        conn.close()
+        self._write(_SQL_INSERT_LIQUIDITY, (pool_address, token_balance, sol_balance, depth_usd))
 
     def record_holder_count(self, count: int, top_10_pct: float = 0.0, top_50_pct: float = 0.0):
         """Record holder count snapshot."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            INSERT INTO holder_snapshots (holder_count, top_10_pct, top_50_pct, timestamp)
-            VALUES (?, ?, ?, ?)
-        """, (count, top_10_pct, top_50_pct, datetime.utcnow().isoformat()))
-
-        conn.commit()
-        conn.close()
+        self._write(_SQL_INSERT_HOLDER_COUNT, (count, top_10_pct, top_50_pct))
 
     def record_trend_score(self, score: TrendScore):
         """Record a trend score calculation."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        self._write(_SQL_INSERT_TREND_SCORE,
+                    (score.signal.value, score.score, score.confidence, score.whale_phase.value,
+                     encode_json(score.key_factors).decode("utf-8"), _to_epoch(score.timestamp)))
 
-        cursor.execute("""
-            INSERT INTO trend_scores
-            (signal, score, confidence, whale_phase, key_factors, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (score.signal.value, score.score, score.confidence,
-              score.whale_phase.value, json.dumps(score.key_factors), score.timestamp))
+    def prune_history(self, raw_days: int = 30, rollup_days: int = 365):
+        """Bound table growth: drop raw snapshots older than ``raw_days``.
 
-        conn.commit()
-        conn.close()
+        Market metrics are first rolled up into hourly averages, which are
+        kept for ``rollup_days``. Trend scores and discovered whales are kept.
+        Runs through the writer queue as one transaction.
+        """
+        now = int(time.time())
+        raw_cutoff = (now - raw_days * 86400) // 3600 * 3600
+        writes = [(_SQL_ROLLUP_MARKET_HOURLY, [(raw_cutoff,)])]
+        writes.extend((sql, [(raw_cutoff,)]) for sql in _SQL_PRUNE_RAW_HISTORY)
+        writes.append((_SQL_PRUNE_MARKET_HOURLY, [(now - rollup_days * 86400,)]))
+        self._write_group(tuple(writes))
 
     def get_wallet_history(self, wallet: str, days: int = 7) -> List[Tuple]:
         """Get wallet balance history for N days."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
-
-        cursor.execute("""
-            SELECT balance, pct_supply, tx_type, tx_amount, timestamp
-            FROM wallet_history
-            WHERE wallet = ? AND timestamp >= ?
-            ORDER BY timestamp ASC
-        """, (wallet, cutoff))
-
-        results = cursor.fetchall()
-        conn.close()
-        return results
+        cutoff = int(time.time()) - days * 86400
+        return self._query(_SQL_WALLET_HISTORY, (wallet, cutoff))
 
     def get_all_wallet_history(self, days: int = 7) -> Dict[str, List[Tuple]]:
         """Get history for all wallets."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cutoff = int(time.time()) - days * 86400
+        results = self._query(_SQL_ALL_WALLET_HISTORY, (cutoff,))
 
-        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        # Rows arrive ordered by wallet, so each wallet is one contiguous run
+        return {
+            wallet: [row[1:] for row in rows]  # Exclude wallet from tuple
+            for wallet, rows in groupby(results, key=lambda row: row[0])
+        }
 
-        cursor.execute("""
-            SELECT wallet, label, balance, pct_supply, tx_type, tx_amount, timestamp
-            FROM wallet_history
-            WHERE timestamp >= ?
-            ORDER BY wallet, timestamp ASC
-        """, (cutoff,))
+    def get_wallet_trend_aggregates(self, days: int = 7,
+                                    wallets: Optional[List[str]] = None) -> Dict[str, Tuple[int, int, int, int]]:
+        """Get (balance_at_start, buy_count, sell_count, net_flow) per wallet for N days.
 
-        results = cursor.fetchall()
-        conn.close()
+        Restrict to ``wallets`` when given; otherwise every wallet is included.
+        """
+        cutoff = int(time.time()) - days * 86400
 
-        # Group by wallet
-        history = {}
-        for row in results:
-            wallet = row[0]
-            if wallet not in history:
-                history[wallet] = []
-            history[wallet].append(row[1:])  # Exclude wallet from tuple
+        if wallets is None:
+            sql_filter, params = "", (cutoff,)
+        elif not wallets:
+            return {}
+        else:
+            placeholders = ", ".join("?" * len(wallets))
+            sql_filter, params = f" AND wallet IN ({placeholders})", (cutoff, *wallets)
+        sql = _SQL_WALLET_TREND_AGGREGATES.format(wallet_filter=sql_filter)
 
-        return history
+        try:
+            rows = self._query(sql, params)
+        except sqlite3.OperationalError as e:
+            if "overflow" not in str(e):
+                raise
+            return self._reduce_wallet_trend_rows(
+                self._query(_SQL_WALLET_TREND_ROWS.format(wallet_filter=sql_filter), params))
+        return {wallet: (balance_at_start, buy_count, sell_count, net_flow)
+                for wallet, balance_at_start, buy_count, sell_count, net_flow in rows}
+
+    @staticmethod
+    def _reduce_wallet_trend_rows(rows: List[Tuple]) -> Dict[str, Tuple[int, int, int, int]]:
+        """Reduce _SQL_WALLET_TREND_ROWS rows to the aggregates' per-wallet tuples."""
+        aggregates = {}
+        for wallet, group in groupby(rows, key=lambda row: row[0]):
+            balance_at_start = None
+            buy_count = sell_count = net_flow = 0
+            for _, balance, tx_type, tx_amount in group:
+                if balance_at_start is None:
+                    balance_at_start = balance
+                if tx_type == "BUY":
+                    buy_count += 1
+                    net_flow += tx_amount
+                elif tx_type == "SELL":
+                    sell_count += 1
+                    net_flow -= tx_amount
+            aggregates[wallet] = (balance_at_start, buy_count, sell_count, net_flow)
+        return aggregates
+
+    def get_wallet_trend_aggregate(self, wallet: str, days: int = 7) -> Optional[Tuple[int, int, int, int]]:
+        """Get (balance_at_start, buy_count, sell_count, net_flow) for one wallet, or None."""
+        cutoff = int(time.time()) - days * 86400
+        try:
+            balance_at_start, buy_count, sell_count, net_flow, row_count = \
+                self._query(_SQL_WALLET_TREND_AGGREGATE, (wallet, cutoff))[0]
+        except sqlite3.OperationalError as e:
+            if "overflow" not in str(e):
+                raise
+            return self._reduce_wallet_trend_rows(self._query(
+                _SQL_WALLET_TREND_ROWS.format(wallet_filter=" AND wallet = ?"), (cutoff, wallet))).get(wallet)
+        if not row_count:
+            return None
+        return balance_at_start, buy_count, sell_count, net_flow
+
+    def get_wallet_window_summaries(self, days: int = 7) -> Dict[str, Tuple[str, int, int, int, int]]:
+        """Get (label, start_balance, end_balance, row_count, tx_count) per wallet for N days."""
+        cutoff = int(time.time()) - days * 86400
+        return {row[0]: row[1:] for row in self._query(_SQL_WALLET_WINDOW_SUMMARIES, (cutoff,))}
 
     def get_liquidity_history(self, days: int = 7) -> List[Tuple]:
         """Get liquidity pool history."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
-
-        cursor.execute("""
-            SELECT token_balance, sol_balance, depth_usd, timestamp
-            FROM liquidity_history
-            WHERE timestamp >= ?
-            ORDER BY timestamp ASC
-        """, (cutoff,))
-
-        results = cursor.fetchall()
-        conn.close()
-        return results
+        cutoff = int(time.time()) - days * 86400
+        return self._query(_SQL_LIQUIDITY_HISTORY, (cutoff,))
 
     def get_holder_history(self, days: int = 7) -> List[Tuple]:
         """Get holder count history."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
-
-        cursor.execute("""
-            SELECT holder_count, top_10_pct, top_50_pct, timestamp
-            FROM holder_snapshots
-            WHERE timestamp >= ?
-            ORDER BY timestamp ASC
-        """, (cutoff,))
-
-        results = cursor.fetchall()
-        conn.close()
-        return results
+        cutoff = int(time.time()) - days * 86400
+        return self._query(_SQL_HOLDER_HISTORY, (cutoff,))
 
     def get_market_history(self, days: int = 7) -> List[Tuple]:
         """Get market metrics history."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        cutoff = int(time.time()) - days * 86400
+        return self._query(_SQL_MARKET_HISTORY, (cutoff,))
 
-        cursor.execute("""
-            SELECT price_usd, volume_24h, liquidity_usd, holder_count, market_cap, timestamp
-            FROM market_history
-            WHERE timestamp >= ?
-            ORDER BY timestamp ASC
-        """, (cutoff,))
-
-        results = cursor.fetchall()
-        conn.close()
-        return results
-
-    def get_trend_score_history(self, days: int = 7) -> List[TrendScore]:
-        """Get trend score history."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
-
-        cursor.execute("""
-            SELECT signal, score, confidence, whale_phase, key_factors, timestamp
-            FROM trend_scores
-            WHERE timestamp >= ?
-            ORDER BY timestamp DESC
-        """, (cutoff,))
-
-        results = cursor.fetchall()
-        conn.close()
-
-        scores = []
-        for row in results:
-            scores.append(TrendScore(
-                signal=TrendSignal(row[0]),
-                score=row[1],
-                confidence=row[2],
-                whale_phase=TrendPhase(row[3]),
-                key_factors=json.loads(row[4]) if row[4] else [],
-                timestamp=row[5]
-            ))
-
-        return scores
+    def get_trend_score_history(self, days: int = 7, limit: Optional[int] = None) -> List[TrendScore]:
+        """Get trend score history, newest first (at most ``limit`` scores)."""
+        cutoff = int(time.time()) - days * 86400
+        # SQLite treats a negative LIMIT as no limit
+        return self._query(_SQL_TREND_SCORE_HISTORY, (cutoff, -1 if limit is None else limit),
+                           row_factory=_trend_score_row)
 
     def record_discovered_whale(self, address: str, token_account: str, 
                                  balance: int, pct_supply: float, rank: int) -> bool:
         """Record a newly discovered whale. Returns True if new, False if already known."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return self.record_discovered_whales([(address, token_account, balance, pct_supply, rank)])[0]
 
-        try:
-            cursor.execute("""
-                INSERT INTO discovered_whales 
-                (address, token_account, balance, pct_supply, rank_when_discovered)
-                VALUES (?, ?, ?, ?, ?)
-            """, (address, token_account, balance, pct_supply, rank))
-            conn.commit()
-            conn.close()
-            return True
-        except sqlite3.IntegrityError:
-            # Already exists
-            conn.close()
-            return False
+    def record_discovered_whales(self, rows: List[Tuple[str, str, int, float, int]]) -> List[bool]:
+        """Record (address, token_account, balance, pct_supply, rank) rows in one transaction.
+
+        Returns, per row, True if the whale was new and False if already known.
+        """
+        with self._conn_lock, self._conn:
+            execute = self._conn.execute
+            # OR IGNORE skips known addresses, leaving rowcount at 0
+            return [execute(_SQL_INSERT_DISCOVERED_WHALE, row).rowcount == 1 for row in rows]
 
     def get_unnotified_whales(self) -> List[Dict]:
         """Get discovered whales that haven't been notified yet."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return [self._unnotified_whale_dict(row) for row in self._query(_SQL_UNNOTIFIED_WHALES)]
 
-        cursor.execute("""
-            SELECT address, token_account, balance, pct_supply, rank_when_discovered, discovered_at
-            FROM discovered_whales
-            WHERE notified = 0
-            ORDER BY pct_supply DESC
-        """)
+    def claim_unnotified_whales(self) -> List[Dict]:
+        """Mark every unnotified whale as notified and return them, in one transaction.
 
-        results = cursor.fetchall()
-        conn.close()
+        Whales discovered concurrently are either returned here or left for
+        the next claim, never marked without being returned.
+        """
+        with self._conn_lock, self._conn:
+            if sqlite3.sqlite_version_info >= (3, 35, 0):
+                rows = self._conn.execute(_SQL_CLAIM_UNNOTIFIED_WHALES).fetchall()
+            else:
+                rows = self._conn.execute(_SQL_UNNOTIFIED_WHALES).fetchall()
+                self._conn.executemany(_SQL_MARK_WHALE_NOTIFIED, [(row[0],) for row in rows])
 
-        whales = []
-        for row in results:
-            whales.append({
-                "address": row[0],
-                "token_account": row[1],
-                "balance": row[2],
-                "pct_supply": row[3],
-                "rank": row[4],
-                "discovered_at": row[5]
-            })
-        return whales
+        # RETURNING order is unspecified; match get_unnotified_whales
+        rows.sort(key=lambda row: row[3], reverse=True)
+        return [self._unnotified_whale_dict(row) for row in rows]
+
+    @staticmethod
+    def _unnotified_whale_dict(row: Tuple) -> Dict:
+        """Map a discovered_whales row to the dict shape used in reports."""
+        return {
+            "address": row[0],
+            "token_account": row[1],
+            "balance": row[2],
+            "pct_supply": row[3],
+            "rank": row[4],
+            "discovered_at": row[5]
+        }
 
     def mark_whales_notified(self, addresses: List[str]):
         """Mark discovered whales as notified."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        for addr in addresses:
-            cursor.execute("""
-                UPDATE discovered_whales SET notified = 1 WHERE address = ?
-            """, (addr,))
-
-        conn.commit()
-        conn.close()
+        self._execute_write(_SQL_MARK_WHALE_NOTIFIED, [(addr,) for addr in addresses])
 
     def get_all_discovered_whales(self) -> List[Dict]:
         """Get all discovered whales."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT address, token_account, balance, pct_supply, rank_when_discovered, 
-                   discovered_at, notified, added_to_tracking
-            FROM discovered_whales
-            ORDER BY pct_supply DESC
-        """)
-
-        results = cursor.fetchall()
-        conn.close()
+        results = self._query(_SQL_ALL_DISCOVERED_WHALES)
 
         whales = []
         for row in results:
@@ -491,25 +1006,15 @@ class TrendDatabase:
 
     def get_latest_holder_snapshot(self) -> Optional[Dict]:
         """Get the most recent holder snapshot."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT holder_count, top_10_pct, top_50_pct, timestamp
-            FROM holder_snapshots
-            ORDER BY timestamp DESC
-            LIMIT 1
-        """)
-
-        result = cursor.fetchone()
-        conn.close()
+        results = self._query(_SQL_LATEST_HOLDER_SNAPSHOT)
+        result = results[0] if results else None
 
         if result:
             return {
                 "holder_count": result[0],
                 "top_10_pct": result[1],
                 "top_50_pct": result[2],
-                "timestamp": result[3]
+                "timestamp": _to_iso(result[3])
             }
         return None
 
@@ -523,11 +1028,22 @@ class DEXDataFetcher:
 
     BIRDEYE_BASE = "https://public-api.birdeye.so"
     JUPITER_PRICE_API = "https://price.jup.ag/v6/price"
+    OVERVIEW_TTL_SECONDS = 30  # Birdeye overview reuse window (price + holders)
+    METRICS_TTL_SECONDS = 30  # Default get_market_metrics reuse window
 
-    def __init__(self, token_address: str, api_key: str = None):
+    def __init__(self, token_address: str, api_key: str = None,
+                 metrics_ttl_seconds: Optional[float] = None):
         self.token_address = token_address
         self.api_key = api_key or os.getenv("BIRDEYE_API_KEY", "")
-        self.session = requests.Session()
+        self.session = make_http_session()
+        # Jupiter and Birdeye are independent; one worker overlaps them
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dex-api")
+        self._overview: Optional[Dict] = None
+        self._overview_fetched_at = 0.0
+        self.metrics_ttl_seconds = (self.METRICS_TTL_SECONDS if metrics_ttl_seconds is None
+                                    else metrics_ttl_seconds)
+        self._metrics: Optional[MarketMetrics] = None
+        self._metrics_fetched_at = 0.0
 
     def get_token_price(self) -> Optional[Dict]:
         """Get current token price from Jupiter."""
@@ -535,10 +1051,10 @@ class DEXDataFetcher:
             response = self.session.get(
                 self.JUPITER_PRICE_API,
                 params={"ids": self.token_address},
-                timeout=10
+                timeout=API_TIMEOUT
             )
             response.raise_for_status()
-            data = response.json()
+            data = decode_json(response.content)
 
             if "data" in data and self.token_address in data["data"]:
                 return data["data"][self.token_address]
@@ -549,23 +1065,33 @@ class DEXDataFetcher:
             return None
 
     def get_token_overview(self) -> Optional[Dict]:
-        """Get token overview from Birdeye (requires API key)."""
+        """Get token overview from Birdeye (requires API key).
+
+        A successful response is reused for OVERVIEW_TTL_SECONDS, so callers
+        wanting both market metrics and holder count pay for one request.
+        """
         if not self.api_key:
             return None
 
+        if (self._overview is not None
+                and time.monotonic() - self._overview_fetched_at < self.OVERVIEW_TTL_SECONDS):
+            return self._overview
+
         try:
             headers = {"X-API-KEY": self.api_key}
             response = self.session.get(
                 f"{self.BIRDEYE_BASE}/defi/token_overview",
                 params={"address": self.token_address},
                 headers=headers,
-                timeout=10
+                timeout=API_TIMEOUT
             )
             response.raise_for_status()
-            data = response.json()
+            data = decode_json(response.content)
 
             if data.get("success") and "data" in data:
-                return data["data"]
+                self._overview = data["data"]
+                self._overview_fetched_at = time.monotonic()
+                return self._overview
             return None
 
         except Exception as e:
@@ -580,16 +1106,27 @@ class DEXDataFetcher:
         return None
 
     def get_market_metrics(self) -> MarketMetrics:
-        """Get comprehensive market metrics."""
+        """Get comprehensive market metrics.
+
+        Metrics with a price or holder count are reused for
+        metrics_ttl_seconds (0 disables reuse); empty results are refetched.
+        """
+        if (self._metrics is not None
+                and time.monotonic() - self._metrics_fetched_at < self.metrics_ttl_seconds):
+            return self._metrics
+
         metrics = MarketMetrics(timestamp=datetime.utcnow().isoformat())
 
+        # Jupiter (price) runs on the worker while Birdeye is fetched here
+        price_future = self._pool.submit(self.get_token_price)
+        overview = self.get_token_overview()
+
         # Try Jupiter for price
-        price_data = self.get_token_price()
+        price_data = price_future.result()
         if price_data:
             metrics.price_usd = price_data.get("price", 0.0)
 
         # Try Birdeye for full overview
-        overview = self.get_token_overview()
         if overview:
             metrics.price_usd = overview.get("price", metrics.price_usd)
             metrics.price_change_24h = overview.get("priceChange24hPercent", 0.0)
@@ -598,6 +1135,9 @@ class DEXDataFetcher:
             metrics.holder_count = overview.get("holder", 0)
             metrics.market_cap = overview.get("mc", 0.0)
 
+        if metrics.price_usd > 0 or metrics.holder_count > 0:
+            self._metrics = metrics
+            self._metrics_fetched_at = time.monotonic()
         return metrics
 
 
@@ -608,10 +1148,27 @@ class DEXDataFetcher:
 class HeliusClient:
     """Client for Helius API - enhanced Solana data."""
 
-    def __init__(self, rpc_url: str, token_address: str):
+    OWNER_LOOKUP_WORKERS = 8  # Concurrent getAccountInfo calls when batching is unavailable
+    MULTIPLE_ACCOUNTS_LIMIT = 100  # Max pubkeys per getMultipleAccounts request
+    OWNER_CACHE_SIZE = 4096  # Token account -> owner entries kept between runs
+    TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9ss623VQ5DA"
+    TOKEN_ACCOUNT_SIZE = 165  # SPL token account data length
+    PROGRAM_ACCOUNTS_TTL_SECONDS = 60  # Reuse window for a successful getProgramAccounts scan
+
+    def __init__(self, rpc_url: str, token_address: str, use_program_accounts: bool = False):
         self.rpc_url = rpc_url
         self.token_address = token_address
-        self.session = requests.Session()
+        # Full getProgramAccounts scans are opt-in: they list every token
+        # account of the mint, and many endpoints reject or throttle them
+        self.use_program_accounts = use_program_accounts
+        self.session = make_http_session()
+        # A token account's owner is fixed at creation, so resolved owners
+        # are kept for the life of the client
+        self._owner_cache: Dict[str, str] = {}
+        # Single-account lookups fill the cache from resolve_owners_parallel's workers
+        self._owner_cache_lock = threading.Lock()
+        self._program_accounts: Optional[List[Dict]] = None
+        self._program_accounts_fetched_at: Optional[float] = None
         
         # Extract API key from RPC URL for DAS API calls
         self.api_key = ""
@@ -640,14 +1197,7 @@ class HeliusClient:
                 }
             }
 
-            response = self.session.post(
-                self.das_url,
-                json=payload,
-                timeout=30,
-                headers={"Content-Type": "application/json"}
-            )
-            response.raise_for_status()
-            result = response.json()
+            result = post_json_rpc(self.session, self.das_url, payload)
 
             if "result" in result:
                 return result["result"]
@@ -680,14 +1230,7 @@ class HeliusClient:
                 "params": params
             }
 
-            response = self.session.post(
-                self.das_url,
-                json=payload,
-                timeout=30,
-                headers={"Content-Type": "application/json"}
-            )
-            response.raise_for_status()
-            result = response.json()
+            result = post_json_rpc(self.session, self.das_url, payload)
 
             if "result" in result:
                 return result["result"]
@@ -713,14 +1256,7 @@ class HeliusClient:
                 }
             }
 
-            response = self.session.post(
-                self.das_url,
-                json=payload,
-                timeout=30,
-                headers={"Content-Type": "application/json"}
-            )
-            response.raise_for_status()
-            result = response.json()
+            result = post_json_rpc(self.session, self.das_url, payload)
 
             if "result" in result and "items" in result["result"]:
                 return result["result"]["items"]
@@ -740,13 +1276,7 @@ class HeliusClient:
                 "params": [self.token_address]
             }
 
-            response = self.session.post(
-                self.rpc_url,
-                json=payload,
-                timeout=30
-            )
-            response.raise_for_status()
-            result = response.json()
+            result = post_json_rpc(self.session, self.rpc_url, payload)
 
             if "result" in result and "value" in result["result"]:
                 return result["result"]["value"][:limit]
@@ -769,13 +1299,7 @@ class HeliusClient:
                 ]
             }
 
-            response = self.session.post(
-                self.rpc_url,
-                json=payload,
-                timeout=30
-            )
-            response.raise_for_status()
-            result = response.json()
+            result = post_json_rpc(self.session, self.rpc_url, payload)
 
             if "result" in result and result["result"]:
                 return result["result"]["value"]
@@ -784,18 +1308,199 @@ class HeliusClient:
         except Exception as e:
             return None
 
-    def resolve_token_account_owner(self, token_account_address: str) -> Optional[str]:
-        """Resolve a token account address to its owner wallet address."""
-        account_info = self.get_account_info(token_account_address)
+    def batch_rpc(self, calls: List[Tuple[str, list]]) -> List[Dict]:
+        """POST several (method, params) calls as one JSON-RPC batch.
+
+        Responses are matched back to their calls by id and returned in call
+        order; a call the server dropped comes back as an empty dict.
+        """
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params) in enumerate(calls)
+        ]
+        responses = post_json_rpc(self.session, self.rpc_url, payload)
+        if not isinstance(responses, list):
+            raise ValueError(f"batch request rejected: {responses}")
+        # The spec allows any response order, so match on id
+        by_id = {resp.get("id"): resp for resp in responses}
+        return [by_id.get(i, {}) for i in range(len(payload))]
+
+    def get_top_holders_and_supply(self, limit: int = 20) -> Tuple[Optional[List[Dict]], int]:
+        """Largest token accounts plus raw token supply in a single round trip.
+
+        Returns (accounts, supply); supply is 0 when the RPC did not report it.
+        """
+        try:
+            largest, supply = self.batch_rpc([
+                ("getTokenLargestAccounts", [self.token_address]),
+                ("getTokenSupply", [self.token_address]),
+            ])
+        except Exception as e:
+            # Not every endpoint accepts batches; fall back to the plain call
+            console.print(f"[dim]Batch RPC failed, fetching holders alone: {e}[/dim]")
+            return self.get_top_holders_via_rpc(limit), 0
+
+        accounts = None
+        if "result" in largest and "value" in largest["result"]:
+            accounts = largest["result"]["value"][:limit]
+        try:
+            supply_raw = int(supply["result"]["value"]["amount"])
+        except (KeyError, TypeError, ValueError):
+            supply_raw = 0
+        return accounts, supply_raw
+
+    @staticmethod
+    def _owner_from_account_info(account_info: Optional[Dict]) -> Optional[str]:
+        """Extract the owner wallet from a jsonParsed token account."""
         if account_info:
             try:
                 parsed = account_info.get("data", {}).get("parsed", {})
                 info = parsed.get("info", {})
-                return info.get("owner")
-            except (KeyError, TypeError):
+                owner = info.get("owner")
+                # Interned so membership probes against tracked addresses
+                # can short-circuit on identity
+                return sys.intern(owner) if owner else None
+            except (KeyError, TypeError, AttributeError):
                 pass
         return None
 
+    def resolve_token_account_owner(self, token_account_address: str) -> Optional[str]:
+        """Resolve a token account address to its owner wallet address."""
+        owner = self._owner_cache.get(token_account_address)
+        if owner is not None:
+            return owner
+        owner = self._owner_from_account_info(self.get_account_info(token_account_address))
+        self._cache_owners({token_account_address: owner})
+        return owner
+
+    def get_multiple_accounts(self, addresses: List[str]) -> List[Optional[Dict]]:
+        """getMultipleAccounts (jsonParsed) for up to MULTIPLE_ACCOUNTS_LIMIT addresses, in order."""
+        payload = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "getMultipleAccounts",
+            "params": [addresses, {"encoding": "jsonParsed"}]
+        }
+        result = post_json_rpc(self.session, self.rpc_url, payload)
+        return result["result"]["value"]
+
+    def resolve_token_account_owners(self, token_account_addresses: List[str]) -> Dict[str, Optional[str]]:
+        """Resolve many token accounts to owner wallets with getMultipleAccounts.
+
+        Owners resolved on an earlier call are served from the cache; the
+        rest are fetched in one request per MULTIPLE_ACCOUNTS_LIMIT addresses.
+        Accounts the batch could not resolve fall back to single-account lookups.
+        """
+        cache = self._owner_cache
+        owners = {address: cache[address] for address in token_account_addresses if address in cache}
+        misses = [address for address in token_account_addresses if address not in owners]
+        if not misses:
+            return owners
+
+        fetched = self._fetch_token_account_owners(misses)
+        self._cache_owners(fetched)
+
+        owners.update(fetched)
+        return owners
+
+    def _cache_owners(self, owners: Dict[str, Optional[str]]):
+        """Remember resolved (non-None) owners, evicting the oldest past OWNER_CACHE_SIZE."""
+        cache = self._owner_cache
+        with self._owner_cache_lock:
+            for address, owner in owners.items():
+                if owner is not None:
+                    cache[address] = owner
+            # Evict the oldest entries once the cache outgrows its bound
+            overflow = len(cache) - self.OWNER_CACHE_SIZE
+            if overflow > 0:
+                for address in list(cache)[:overflow]:
+                    del cache[address]
+
+    def _fetch_token_account_owners(self, token_account_addresses: List[str]) -> Dict[str, Optional[str]]:
+        """Resolve owners over RPC, batched with single-account fallback."""
+        owners: Dict[str, Optional[str]] = {}
+        limit = self.MULTIPLE_ACCOUNTS_LIMIT
+        try:
+            for start in range(0, len(token_account_addresses), limit):
+                chunk = token_account_addresses[start:start + limit]
+                for address, account_info in zip(chunk, self.get_multiple_accounts(chunk)):
+                    owners[address] = self._owner_from_account_info(account_info)
+        except Exception as e:
+            console.print(f"[dim]getMultipleAccounts failed, resolving concurrently: {e}[/dim]")
+            return self.resolve_owners_parallel(token_account_addresses)
+
+        unresolved = [address for address in token_account_addresses if owners.get(address) is None]
+        if unresolved:
+            owners.update(self.resolve_owners_parallel(unresolved))
+        return owners
+
+    def get_all_token_accounts_parsed(self) -> Optional[List[Dict]]:
+        """Every token account of the mint via getProgramAccounts (jsonParsed).
+
+        Each entry carries the account's owner and balance, so no owner
+        lookups are needed. Returns None unless use_program_accounts is set,
+        or when the provider rejects the call, as many public endpoints do.
+        A non-empty result is reused for PROGRAM_ACCOUNTS_TTL_SECONDS;
+        failures are retried on the next call.
+        """
+        if not self.use_program_accounts:
+            return None
+
+        now = time.monotonic()
+        if (self._program_accounts_fetched_at is not None
+                and now - self._program_accounts_fetched_at < self.PROGRAM_ACCOUNTS_TTL_SECONDS):
+            return self._program_accounts
+
+        accounts = None
+        try:
+            payload = {
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "getProgramAccounts",
+                "params": [
+                    self.TOKEN_PROGRAM_ID,
+                    {
+                        "encoding": "jsonParsed",
+                        "filters": [
+                            {"dataSize": self.TOKEN_ACCOUNT_SIZE},
+                            {"memcmp": {"offset": 0, "bytes": self.token_address}}
+                        ]
+                    }
+                ]
+            }
+
+            result = post_json_rpc(self.session, self.rpc_url, payload, timeout=RPC_SCAN_TIMEOUT)
+            if isinstance(result.get("result"), list):
+                accounts = result["result"]
+
+        except Exception as e:
+            console.print(f"[dim]getProgramAccounts unavailable: {e}[/dim]")
+
+        if accounts:
+            self._program_accounts = accounts
+            self._program_accounts_fetched_at = now
+        return accounts
+
+    @staticmethod
+    def parse_program_token_account(entry: Dict) -> Optional[Tuple[str, str, int, int]]:
+        """(token_account, owner, amount, decimals) from a getProgramAccounts entry."""
+        try:
+            info = entry["account"]["data"]["parsed"]["info"]
+            token_amount = info["tokenAmount"]
+            return entry["pubkey"], info["owner"], int(token_amount["amount"]), token_amount.get("decimals", 0)
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def resolve_owners_parallel(self, token_account_addresses: List[str],
+                                workers: int = OWNER_LOOKUP_WORKERS) -> Dict[str, Optional[str]]:
+        """Resolve token account owners with concurrent single-account requests."""
+        if not token_account_addresses:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(workers, len(token_account_addresses)),
+                                thread_name_prefix="helius-owner") as pool:
+            owners = pool.map(self.resolve_token_account_owner, token_account_addresses)
+            return dict(zip(token_account_addresses, owners))
+
 
 # ============================================================
 # HOLDER COUNT TRACKER (Enhanced with Helius)
@@ -804,24 +1509,63 @@ class HeliusClient:
 class HolderTracker:
     """Tracks token holder count and discovers new whales."""
 
-    def __init__(self, rpc_url: str, token_address: str, token_decimals: int = 9):
+    LARGEST_ACCOUNTS_MAX = 20  # getTokenLargestAccounts never returns more
+    TOP_HOLDERS_TTL_SECONDS = 30  # One fetch serves discovery, summary and market data
+
+    def __init__(self, rpc_url: str, token_address: str, token_decimals: int = 9,
+                 use_program_accounts: bool = False):
         self.rpc_url = rpc_url
         self.token_address = token_address
         self.token_decimals = token_decimals
-        self.session = requests.Session()
-        self.helius = HeliusClient(rpc_url, token_address)
+        self._scale = 10 ** token_decimals  # Raw units per token
+        self.session = make_http_session()
+        self.helius = HeliusClient(rpc_url, token_address, use_program_accounts)
         self.known_whales: set = set()  # Track known whale addresses
         self.last_top_holders: List[Dict] = []  # Store last known top holders
+        self._top_accounts: Optional[List[Dict]] = None
+        self._top_supply = 0
+        self._top_fetched_at: Optional[float] = None
+
+    def refresh_top_holders(self, force: bool = False) -> Tuple[Optional[List[Dict]], int]:
+        """Largest token accounts and raw supply, fetched at most once per TTL window.
+
+        Discovery, the holder summary and the market snapshot all read the
+        same list within one analysis run; this keeps that to one request.
+        Failed fetches are not cached.
+        """
+        now = time.monotonic()
+        if (not force and self._top_fetched_at is not None
+                and now - self._top_fetched_at < self.TOP_HOLDERS_TTL_SECONDS):
+            return self._top_accounts, self._top_supply
+
+        accounts, supply = self.helius.get_top_holders_and_supply(self.LARGEST_ACCOUNTS_MAX)
+        if accounts is not None:
+            self._top_accounts, self._top_supply = accounts, supply
+            self._top_fetched_at = now
+        return accounts, supply
 
     def get_token_largest_accounts(self, limit: int = 20) -> Optional[List[Dict]]:
         """Get largest token accounts."""
-        return self.helius.get_top_holders_via_rpc(limit)
+        accounts, _ = self.refresh_top_holders()
+        return accounts[:limit] if accounts is not None else None
+
+    def get_largest_accounts_with_supply(self, limit: int = 20) -> Tuple[Optional[List[Dict]], int]:
+        """Get largest token accounts and the raw on-chain supply in one batched request."""
+        accounts, supply = self.refresh_top_holders()
+        return (accounts[:limit] if accounts is not None else None), supply
 
     def get_holder_count_estimate(self) -> int:
         """
         Estimate holder count by checking token supply info.
         Note: Exact holder count requires indexing all accounts.
+        With use_program_accounts enabled and allowed by the RPC, that index
+        is available and the count of non-empty token accounts is returned.
         """
+        accounts = self.helius.get_all_token_accounts_parsed()
+        if accounts:
+            parse = self.helius.parse_program_token_account
+            return sum(1 for parsed in map(parse, accounts) if parsed and parsed[2] > 0)
+
         try:
             payload = {
                 "jsonrpc": "2.0",
@@ -830,13 +1574,7 @@ class HolderTracker:
                 "params": [self.token_address]
             }
 
-            response = self.session.post(
-                self.rpc_url,
-                json=payload,
-                timeout=30
-            )
-            response.raise_for_status()
-            result = response.json()
+            result = post_json_rpc(self.session, self.rpc_url, payload)
 
             # Token supply doesn't give holder count, but we can track accounts
             # For now, return 0 and rely on other methods
@@ -845,7 +1583,7 @@ class HolderTracker:
         except Exception:
             return 0
 
-    def discover_new_whales(self, tracked_addresses: set, min_balance_pct: float = 1.0, 
+    def discover_new_whales(self, tracked_addresses: AbstractSet[str], min_balance_pct: float = 1.0, 
                            total_supply: int = 1_000_000_000) -> List[Dict]:
         """
         Discover new whale wallets that aren't being tracked.
@@ -859,19 +1597,24 @@ class HolderTracker:
         if not top_holders:
             return new_whales
 
-        min_balance = int(min_balance_pct / 100 * total_supply * (10 ** self.token_decimals))
-        
+        min_balance = int(min_balance_pct / 100 * total_supply * self._scale)
+
+        # Keep holders above threshold, then resolve their owners in one request
+        candidates = []
         for i, holder in enumerate(top_holders):
             try:
-                token_account = holder.get("address", "")
                 amount = int(holder.get("amount", 0))
-                
-                # Skip if below threshold
-                if amount < min_balance:
-                    continue
-                
+            except (ValueError, TypeError):
+                continue
+            if amount >= min_balance:
+                candidates.append((i, holder.get("address", ""), amount))
+
+        owners = self.helius.resolve_token_account_owners([account for _, account, _ in candidates])
+
+        for i, token_account, amount in candidates:
+            try:
                 # Resolve to owner wallet
-                owner = self.helius.resolve_token_account_owner(token_account)
+                owner = owners.get(token_account)
                 if not owner:
                     continue
                 
@@ -880,16 +1623,11 @@ class HolderTracker:
                     continue
                 
                 # Calculate percentage
-                pct_supply = (amount / (10 ** self.token_decimals)) / total_supply * 100
+                balance_display = amount / self._scale
+                pct_supply = balance_display / total_supply * 100
                 
                 # Format balance
-                balance_display = amount / (10 ** self.token_decimals)
-                if balance_display >= 1_000_000:
-                    balance_str = f"{balance_display/1_000_000:.1f}M"
-                elif balance_display >= 1_000:
-                    balance_str = f"{balance_display/1_000:.1f}K"
-                else:
-                    balance_str = f"{balance_display:.0f}"
+                balance_str = _format_token_amount(balance_display)
                 
                 new_whales.append({
                     "rank": i + 1,
@@ -906,49 +1644,88 @@ class HolderTracker:
         
         return new_whales
 
-    def get_top_holders_with_owners(self, limit: int = 20) -> List[Dict]:
-        """Get top holders with resolved owner addresses."""
+    def get_top_holders_with_owners(self, limit: int = 20, resolve: bool = True,
+                                    min_amount: int = 0) -> List[Dict]:
+        """Get top holders with resolved owner addresses.
+
+        With use_program_accounts enabled and allowed by the RPC, holders and
+        their owners come from that single call and every owner is known. Otherwise only
+        holders with at least ``min_amount`` raw units have their owner
+        resolved; the rest, or every holder when ``resolve`` is False, are
+        listed with owner "unknown".
+        """
+        holders = self._top_holders_from_program_accounts(limit)
+        if holders is not None:
+            self.last_top_holders = holders
+            return holders
+
         holders = []
         top_accounts = self.get_token_largest_accounts(limit)
         
         if not top_accounts:
             return holders
-            
+
+        # Parse amounts first so only the holders worth surfacing cost a lookup
+        parsed = []
         for i, account in enumerate(top_accounts):
             try:
-                token_account = account.get("address", "")
-                amount = int(account.get("amount", 0))
-                
-                # Resolve owner
-                owner = self.helius.resolve_token_account_owner(token_account)
-                
-                holders.append({
-                    "rank": i + 1,
-                    "token_account": token_account,
-                    "owner": owner or "unknown",
-                    "balance": amount,
-                    "decimals": account.get("decimals", self.token_decimals)
-                })
-            except (KeyError, ValueError):
+                parsed.append((i, account, int(account.get("amount", 0))))
+            except (ValueError, TypeError):
                 continue
+
+        # Resolve the selected owners in one batched request
+        owners: Dict[str, Optional[str]] = {}
+        if resolve:
+            owners = self.helius.resolve_token_account_owners(
+                [account.get("address", "") for _, account, amount in parsed if amount >= min_amount]
+            )
+
+        for i, account, amount in parsed:
+            token_account = account.get("address", "")
+            holders.append({
+                "rank": i + 1,
+                "token_account": token_account,
+                "owner": owners.get(token_account) or "unknown",
+                "balance": amount,
+                "decimals": account.get("decimals", self.token_decimals)
+            })
         
         self.last_top_holders = holders
         return holders
 
+    def _top_holders_from_program_accounts(self, limit: int) -> Optional[List[Dict]]:
+        """Top holders from getProgramAccounts, or None when it is unavailable."""
+        accounts = self.helius.get_all_token_accounts_parsed()
+        if not accounts:
+            return None
+
+        parsed = filter(None, map(self.helius.parse_program_token_account, accounts))
+        top = heapq.nlargest(limit, parsed, key=lambda account: account[2])
+        return [
+            {
+                "rank": i + 1,
+                "token_account": token_account,
+                # Interned like _owner_from_account_info's owners
+                "owner": sys.intern(owner),
+                "balance": amount,
+                "decimals": decimals
+            }
+            for i, (token_account, owner, amount, decimals) in enumerate(top)
+        ]
+
     def calculate_concentration(self, accounts: List[Dict], total_supply: int) -> Tuple[float, float]:
         """Calculate top 10 and top 50 holder concentration."""
-        if not accounts:
+        if not accounts or total_supply <= 0:
             return 0.0, 0.0
 
-        amounts = [int(acc.get("amount", 0)) for acc in accounts]
+        # Only the top 50 matter; parse just those and sum the top 10 once
+        amounts = [int(acc.get("amount", 0)) for acc in accounts[:50]]
 
         top_10_total = sum(amounts[:10])
-        top_50_total = sum(amounts[:min(50, len(amounts))])
-
-        top_10_pct = (top_10_total / total_supply * 100) if total_supply > 0 else 0.0
-        top_50_pct = (top_50_total / total_supply * 100) if total_supply > 0 else 0.0
+        top_50_total = top_10_total + sum(amounts[10:])
 
-        return top_10_pct, top_50_pct
+        to_pct = 100 / total_supply
+        return top_10_total * to_pct, top_50_total * to_pct
 
     def detect_holder_changes(self, previous_holders: List[Dict], 
                               current_holders: List[Dict]) -> Dict:
@@ -966,23 +1743,19 @@ class HolderTracker:
         prev_owners = {h.get("owner", h.get("address")): h for h in previous_holders}
         curr_owners = {h.get("owner", h.get("address")): h for h in current_holders}
         
-        # Find new entries
-        for owner, data in curr_owners.items():
-            if owner not in prev_owners and owner != "unknown":
-                changes["new_entries"].append({
-                    "owner": owner,
-                    "rank": data.get("rank"),
-                    "balance": data.get("balance")
-                })
-        
-        # Find exits
-        for owner, data in prev_owners.items():
-            if owner not in curr_owners and owner != "unknown":
-                changes["exits"].append({
-                    "owner": owner,
-                    "previous_rank": data.get("rank"),
-                    "balance": data.get("balance")
-                })
+        # Set difference on the key views finds entries/exits; iterating the
+        # dicts afterwards keeps the results in rank order
+        entered = curr_owners.keys() - prev_owners.keys() - {"unknown"}
+        exited = prev_owners.keys() - curr_owners.keys() - {"unknown"}
+
+        changes["new_entries"] = [
+            {"owner": owner, "rank": data.get("rank"), "balance": data.get("balance")}
+            for owner, data in curr_owners.items() if owner in entered
+        ]
+        changes["exits"] = [
+            {"owner": owner, "previous_rank": data.get("rank"), "balance": data.get("balance")}
+            for owner, data in prev_owners.items() if owner in exited
+        ]
         
         return changes
 
@@ -999,34 +1772,99 @@ class TrendAnalyzer:
     DISTRIBUTION_THRESHOLD = -2   # Net sells over buys for distribution
     VELOCITY_HIGH_THRESHOLD = 2.0  # High velocity (% change per day)
 
+    # Score -> signal: <= -40 strong bearish, <= -15 bearish, >= 15 bullish,
+    # >= 40 strong bullish. Scores are ints, so the lower bins sit one above.
+    SIGNAL_BINS = (-39, -14, 15, 40)
+    SIGNAL_LEVELS = (TrendSignal.STRONG_BEARISH, TrendSignal.BEARISH, TrendSignal.NEUTRAL,
+                     TrendSignal.BULLISH, TrendSignal.STRONG_BULLISH)
+
+    # Score points and factor text per whale-count tier (0, 1, 2, 3+)
+    PHASE_POINTS = (0, 10, 20, 30)
+    ACCUMULATING_FACTORS = ("", "1 whale accumulating", "{} whales accumulating",
+                            "{} whales accumulating")
+    DISTRIBUTING_FACTORS = ("", "1 whale distributing", "WARNING: {} whales distributing",
+                            "CRITICAL: {} whales distributing")
+
     def __init__(self, db: TrendDatabase, token_decimals: int = 9, total_supply: int = 1_000_000_000):
         self.db = db
         self.decimals = token_decimals
         self.total_supply = total_supply
+        self._scale = 10 ** token_decimals            # Raw units per token
+        self._scale_m = self._scale * 1_000_000       # Raw units per 1M tokens
 
     def analyze_wallet_trend(self, wallet: str, label: str, current_balance: int,
-                              days: int = 7) -> WhaleTrendMetrics:
-        """Analyze trend for a single wallet."""
-        history = self.db.get_wallet_history(wallet, days)
+                              days: int = 7, history: List[Tuple] = None) -> WhaleTrendMetrics:
+        """Analyze trend for a single wallet.
+
+        By default the history is reduced inside SQLite. Pass ``history``
+        (rows shaped like get_wallet_history()) to reduce rows already in
+        memory instead.
+        """
+        if history is None:
+            aggregate = self.db.get_wallet_trend_aggregate(wallet, days)
+            if aggregate is None:
+                return self._empty_wallet_metrics(wallet, label, current_balance)
+            return self._build_wallet_metrics(wallet, label, current_balance, *aggregate, days)
 
         # Default values if no history
         if not history:
-            return WhaleTrendMetrics(
-                wallet=wallet,
-                label=label,
-                current_balance=current_balance,
-                balance_7d_ago=current_balance,
-                balance_change_7d=0,
-                balance_change_7d_pct=0.0,
-                buy_count_7d=0,
-                sell_count_7d=0,
-                net_flow_7d=0,
-                velocity=0.0,
-                phase=TrendPhase.UNKNOWN
-            )
+            return self._empty_wallet_metrics(wallet, label, current_balance)
 
         # Get oldest balance in window
         balance_7d_ago = history[0][0]  # First record's balance
+
+        # Count buy/sell transactions and net flow (total bought - total sold)
+        # in a single pass over the history
+        buy_count = sell_count = net_flow = 0
+        for _, _, tx_type, tx_amount, _ in history:
+            if tx_type == "BUY":
+                buy_count += 1
+                net_flow += tx_amount
+            elif tx_type == "SELL":
+                sell_count += 1
+                net_flow -= tx_amount
+
+        return self._build_wallet_metrics(wallet, label, current_balance, balance_7d_ago,
+                                          buy_count, sell_count, net_flow, days)
+
+    def analyze_wallet_trends(self, wallets: List[Tuple[str, str, int]],
+                              days: int = 7) -> List[WhaleTrendMetrics]:
+        """Analyze (address, label, current_balance) wallets from SQL-side aggregates."""
+        aggregates = self.db.get_wallet_trend_aggregates(days, [wallet for wallet, _, _ in wallets])
+
+        build, empty = self._build_wallet_metrics, self._empty_wallet_metrics
+        return [
+            build(wallet, label, current_balance, *row, days) if row is not None
+            else empty(wallet, label, current_balance)
+            for (wallet, label, current_balance), row
+            in zip(wallets, map(aggregates.get, (wallet for wallet, _, _ in wallets)))
+        ]
+
+    @staticmethod
+    def _empty_wallet_metrics(wallet: str, label: str,
+                              current_balance: int) -> WhaleTrendMetrics:
+        """Metrics for a wallet with no history in the window (a fresh instance per call)."""
+        # Built directly rather than cached or copied from a zeroed template:
+        # a shared instance leaks mutations between callers, and
+        # dataclasses.replace on the slotted class is ~2.5x slower than this
+        return WhaleTrendMetrics(
+            wallet=wallet,
+            label=label,
+            current_balance=current_balance,
+            balance_7d_ago=current_balance,
+            balance_change_7d=0,
+            balance_change_7d_pct=0.0,
+            buy_count_7d=0,
+            sell_count_7d=0,
+            net_flow_7d=0,
+            velocity=0.0,
+            phase=_UNKNOWN
+        )
+
+    def _build_wallet_metrics(self, wallet: str, label: str, current_balance: int,
+                              balance_7d_ago: int, buy_count: int, sell_count: int,
+                              net_flow: int, days: int) -> WhaleTrendMetrics:
+        """Derive change, velocity and phase from a wallet's reduced history."""
         balance_change = current_balance - balance_7d_ago
 
         # Calculate percentage change
@@ -1035,19 +1873,6 @@ class TrendAnalyzer:
         else:
             balance_change_pct = 100.0 if balance_change > 0 else 0.0
 
-        # Count buy/sell transactions
-        buy_count = sum(1 for h in history if h[2] == "BUY")
-        sell_count = sum(1 for h in history if h[2] == "SELL")
-
-        # Calculate net flow (total bought - total sold)
-        net_flow = 0
-        for h in history:
-            tx_type, tx_amount = h[2], h[3]
-            if tx_type == "BUY":
-                net_flow += tx_amount
-            elif tx_type == "SELL":
-                net_flow -= tx_amount
-
         # Calculate velocity (average daily change)
         velocity = balance_change_pct / days if days > 0 else 0.0
 
@@ -1074,13 +1899,13 @@ class TrendAnalyzer:
         net_tx = buy_count - sell_count
 
         if net_tx >= self.ACCUMULATION_THRESHOLD and net_flow > 0:
-            return TrendPhase.ACCUMULATION
+            return _ACCUMULATION
         elif net_tx <= self.DISTRIBUTION_THRESHOLD and net_flow < 0:
-            return TrendPhase.DISTRIBUTION
+            return _DISTRIBUTION
         elif abs(velocity) < 0.5:  # Low velocity = consolidation
-            return TrendPhase.CONSOLIDATION
+            return _CONSOLIDATION
         else:
-            return TrendPhase.UNKNOWN
+            return _UNKNOWN
 
     def analyze_liquidity_trend(self, days: int = 7) -> Dict:
         """Analyze liquidity pool depth trend."""
@@ -1139,82 +1964,97 @@ class TrendAnalyzer:
             "current_count": last_count
         }
 
+    @staticmethod
+    def _tally_whale_metrics(wallet_metrics: List[WhaleTrendMetrics]) -> Tuple[int, int, int, float]:
+        """Return (accumulating, distributing, total_net_flow, avg_velocity) in one pass."""
+        accumulating = distributing = total_net_flow = 0
+        velocity_sum = 0.0
+        for m in wallet_metrics:
+            phase = m.phase
+            if phase is _ACCUMULATION:
+                accumulating += 1
+            elif phase is _DISTRIBUTION:
+                distributing += 1
+            total_net_flow += m.net_flow_7d
+            velocity_sum += m.velocity
+
+        avg_velocity = velocity_sum / len(wallet_metrics) if wallet_metrics else 0
+        return accumulating, distributing, total_net_flow, avg_velocity
+
     def calculate_trend_score(self, wallet_metrics: List[WhaleTrendMetrics],
-                               market_metrics: Optional[MarketMetrics] = None) -> TrendScore:
-        """Calculate overall trend score from all signals."""
+                               market_metrics: Optional[MarketMetrics] = None,
+                               liquidity_trend: Optional[Dict] = None,
+                               holder_trend: Optional[Dict] = None) -> TrendScore:
+        """Calculate overall trend score from all signals.
+
+        Pass ``liquidity_trend``/``holder_trend`` when the caller already has
+        them to skip re-querying the database.
+        """
         score = 0
         factors = []
+        add_factor = factors.append
 
         # ============================================
         # WHALE BEHAVIOR SIGNALS (most important)
         # ============================================
 
-        # Count whales in each phase
-        accumulating = sum(1 for m in wallet_metrics if m.phase == TrendPhase.ACCUMULATION)
-        distributing = sum(1 for m in wallet_metrics if m.phase == TrendPhase.DISTRIBUTION)
-
-        # Phase scoring (-30 to +30)
-        if accumulating >= 3:
-            score += 30
-            factors.append(f"{accumulating} whales accumulating")
-        elif accumulating >= 2:
-            score += 20
-            factors.append(f"{accumulating} whales accumulating")
-        elif accumulating == 1:
-            score += 10
-            factors.append("1 whale accumulating")
-
-        if distributing >= 3:
-            score -= 30
-            factors.append(f"CRITICAL: {distributing} whales distributing")
-        elif distributing >= 2:
-            score -= 20
-            factors.append(f"WARNING: {distributing} whales distributing")
-        elif distributing == 1:
-            score -= 10
-            factors.append("1 whale distributing")
+        # Count whales in each phase and total their flow/velocity
+        accumulating, distributing, total_net_flow, avg_velocity = \
+            self._tally_whale_metrics(wallet_metrics)
+
+        # Phase scoring (-30 to +30), tiered by whale count capped at 3
+        tier = min(accumulating, 3)
+        if tier:
+            score += self.PHASE_POINTS[tier]
+            add_factor(self.ACCUMULATING_FACTORS[tier].format(accumulating))
+
+        tier = min(distributing, 3)
+        if tier:
+            score -= self.PHASE_POINTS[tier]
+            add_factor(self.DISTRIBUTING_FACTORS[tier].format(distributing))
 
         # Net whale flow (-20 to +20)
-        total_net_flow = sum(m.net_flow_7d for m in wallet_metrics)
+        net_flow_m = abs(total_net_flow) / self._scale_m
         if total_net_flow > 0:
-            score += min(20, int(total_net_flow / (10 ** self.decimals) / 1_000_000))  # +1 per 1M tokens
-            factors.append(f"Net inflow: {total_net_flow / (10 ** self.decimals) / 1_000_000:.1f}M")
+            score += min(20, int(net_flow_m))  # +1 per 1M tokens
+            add_factor(f"Net inflow: {net_flow_m:.1f}M")
         elif total_net_flow < 0:
-            score -= min(20, int(abs(total_net_flow) / (10 ** self.decimals) / 1_000_000))
-            factors.append(f"Net outflow: {abs(total_net_flow) / (10 ** self.decimals) / 1_000_000:.1f}M")
+            score -= min(20, int(net_flow_m))
+            add_factor(f"Net outflow: {net_flow_m:.1f}M")
 
         # Average velocity (-10 to +10)
-        avg_velocity = sum(m.velocity for m in wallet_metrics) / len(wallet_metrics) if wallet_metrics else 0
         if avg_velocity > self.VELOCITY_HIGH_THRESHOLD:
             score += 10
-            factors.append(f"High buy velocity: {avg_velocity:.1f}%/day")
+            add_factor(f"High buy velocity: {avg_velocity:.1f}%/day")
         elif avg_velocity < -self.VELOCITY_HIGH_THRESHOLD:
             score -= 10
-            factors.append(f"High sell velocity: {avg_velocity:.1f}%/day")
+            add_factor(f"High sell velocity: {avg_velocity:.1f}%/day")
 
         # ============================================
         # LIQUIDITY SIGNALS
         # ============================================
-        liquidity_trend = self.analyze_liquidity_trend()
+        if liquidity_trend is None:
+            liquidity_trend = self.analyze_liquidity_trend()
 
         if liquidity_trend["is_shrinking"]:
             score -= 15
-            factors.append(f"Liquidity shrinking: {liquidity_trend['change_pct']:.1f}%")
+            add_factor(f"Liquidity shrinking: {liquidity_trend['change_pct']:.1f}%")
         elif liquidity_trend["trend"] == "GROWING":
             score += 10
-            factors.append(f"Liquidity growing: {liquidity_trend['change_pct']:.1f}%")
+            add_factor(f"Liquidity growing: {liquidity_trend['change_pct']:.1f}%")
 
         # ============================================
         # HOLDER COUNT SIGNALS
         # ============================================
-        holder_trend = self.analyze_holder_trend()
+        if holder_trend is None:
+            holder_trend = self.analyze_holder_trend()
 
         if holder_trend["is_declining"]:
             score -= 15
-            factors.append(f"Holders declining: {holder_trend['change']}")
+            add_factor(f"Holders declining: {holder_trend['change']}")
         elif holder_trend["trend"] == "GROWING":
             score += 15
-            factors.append(f"Holders growing: +{holder_trend['change']}")
+            add_factor(f"Holders growing: +{holder_trend['change']}")
 
         # ============================================
         # MARKET METRICS (if available)
@@ -1223,20 +2063,20 @@ class TrendAnalyzer:
             # Volume signal
             if market_metrics.volume_24h > 1_000_000:
                 score += 5
-                factors.append(f"Strong volume: ${market_metrics.volume_24h/1e6:.1f}M")
+                add_factor(f"Strong volume: ${market_metrics.volume_24h/1e6:.1f}M")
             elif market_metrics.volume_24h < 100_000:
                 score -= 5
-                factors.append(f"Low volume: ${market_metrics.volume_24h/1e3:.0f}K")
+                add_factor(f"Low volume: ${market_metrics.volume_24h/1e3:.0f}K")
 
             # Price trend correlation
             if market_metrics.price_change_24h > 10:
                 if accumulating > distributing:
                     score += 5  # Whales buying into strength
-                    factors.append("Whales buying into strength")
+                    add_factor("Whales buying into strength")
             elif market_metrics.price_change_24h < -10:
                 if distributing > accumulating:
                     score -= 10  # Whales selling into weakness
-                    factors.append("WARNING: Whales selling into weakness")
+                    add_factor("WARNING: Whales selling into weakness")
 
         # ============================================
         # DETERMINE SIGNAL AND CONFIDENCE
@@ -1246,16 +2086,7 @@ class TrendAnalyzer:
         score = max(-100, min(100, score))
 
         # Determine signal level
-        if score >= 40:
-            signal = TrendSignal.STRONG_BULLISH
-        elif score >= 15:
-            signal = TrendSignal.BULLISH
-        elif score <= -40:
-            signal = TrendSignal.STRONG_BEARISH
-        elif score <= -15:
-            signal = TrendSignal.BEARISH
-        else:
-            signal = TrendSignal.NEUTRAL
+        signal = self.SIGNAL_LEVELS[bisect_right(self.SIGNAL_BINS, score)]
 
         # Calculate confidence (0-1) based on data quality
         data_points = len(wallet_metrics)
@@ -1272,11 +2103,11 @@ class TrendAnalyzer:
 
         # Determine dominant whale phase
         if accumulating > distributing:
-            whale_phase = TrendPhase.ACCUMULATION
+            whale_phase = _ACCUMULATION
         elif distributing > accumulating:
-            whale_phase = TrendPhase.DISTRIBUTION
+            whale_phase = _DISTRIBUTION
         else:
-            whale_phase = TrendPhase.CONSOLIDATION
+            whale_phase = _CONSOLIDATION
 
         return TrendScore(
             signal=signal,
@@ -1310,30 +2141,26 @@ class TrendFormatter:
         TrendPhase.UNKNOWN: "dim",
     }
 
+    # Pre-rendered phase cells for the whale table, one per phase
+    PHASE_CELLS = {phase: f"[{color}]{phase.value}[/{color}]" for phase, color in PHASE_COLORS.items()}
+
+    # Key-factor keywords, matched against the lower-cased factor text
+    POSITIVE_FACTOR_RE = re.compile(r"accumulating|growing|inflow|strength")
+    NEGATIVE_FACTOR_RE = re.compile(r"distributing|declining|outflow|weakness|shrinking")
+
     def __init__(self, token_decimals: int = 9):
         self.decimals = token_decimals
+        self._scale = 10 ** token_decimals  # Raw units per token
 
     def format_balance(self, raw_balance: int) -> str:
         """Format token balance for display."""
-        balance = raw_balance / (10 ** self.decimals)
-        if balance >= 1_000_000:
-            return f"{balance/1_000_000:.1f}M"
-        elif balance >= 1_000:
-            return f"{balance/1_000:.1f}K"
-        else:
-            return f"{balance:.0f}"
+        return _format_token_amount(raw_balance / self._scale)
 
     def print_trend_score(self, score: TrendScore):
         """Print the overall trend score."""
         color = self.SIGNAL_COLORS[score.signal]
         phase_color = self.PHASE_COLORS[score.whale_phase]
 
-        # Score bar visualization
-        bar_width = 40
-        normalized = (score.score + 100) / 200  # 0 to 1
-        filled = int(normalized * bar_width)
-        bar = "[red]" + "-" * 20 + "[/red][yellow]|[/yellow][green]" + "-" * 20 + "[/green]"
-
         console.print()
         console.print(Panel.fit(
             f"[bold]TREND SIGNAL: [{color}]{score.signal.value}[/{color}][/bold]\n"
@@ -1349,9 +2176,11 @@ class TrendFormatter:
             for factor in score.key_factors:
                 if "CRITICAL" in factor or "WARNING" in factor:
                     console.print(f"  [red]! {factor}[/red]")
-                elif any(x in factor.lower() for x in ["accumulating", "growing", "inflow", "strength"]):
+                    continue
+                lowered = factor.lower()
+                if self.POSITIVE_FACTOR_RE.search(lowered):
                     console.print(f"  [green]+ {factor}[/green]")
-                elif any(x in factor.lower() for x in ["distributing", "declining", "outflow", "weakness", "shrinking"]):
+                elif self.NEGATIVE_FACTOR_RE.search(lowered):
                     console.print(f"  [red]- {factor}[/red]")
                 else:
                     console.print(f"  [dim]* {factor}[/dim]")
@@ -1375,7 +2204,6 @@ class TrendFormatter:
 
             # Color coding
             change_color = "green" if m.balance_change_7d_pct > 0 else "red" if m.balance_change_7d_pct < 0 else "white"
-            phase_color = self.PHASE_COLORS[m.phase]
 
             table.add_row(
                 m.label,
@@ -1384,7 +2212,7 @@ class TrendFormatter:
                 f"[{change_color}]{velocity_str}[/{change_color}]",
                 str(m.buy_count_7d),
                 str(m.sell_count_7d),
-                f"[{phase_color}]{m.phase.value}[/{phase_color}]"
+                self.PHASE_CELLS[m.phase]
             )
 
         console.print()
@@ -1453,6 +2281,65 @@ class TrendFormatter:
 # INTEGRATION WITH MAIN TRACKER
 # ============================================================
 
+# Parsed configs keyed by (absolute path, mtime); one entry per path
+_CONFIG_CACHE: Dict[Tuple[str, int], Dict] = {}
+
+
+def _load_config(config_path: str) -> Dict:
+    """Parse a YAML config file, reusing the parse while the file is unchanged.
+
+    The returned dict is shared between callers and must not be mutated.
+    """
+    path = os.path.abspath(config_path)
+    key = (path, os.stat(path).st_mtime_ns)
+    config = _CONFIG_CACHE.get(key)
+    if config is None:
+        import yaml
+        # libyaml-backed loader when PyYAML was built with it
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        with open(path, 'r') as f:
+            config = yaml.load(f, Loader=loader)
+        for stale in [k for k in _CONFIG_CACHE if k[0] == path]:
+            del _CONFIG_CACHE[stale]
+        _CONFIG_CACHE[key] = config
+    return config
+
+
+def _wallet_state_fields(state) -> Tuple[str, int, float, Optional[str], int, bool]:
+    """Return (label, balance, pct_supply, tx_type, tx_amount, is_pool) for a wallet state.
+
+    Accepts both the tracker's WalletState dataclass and mappings (plain
+    dicts, OrderedDicts, read-only views of JSON state).
+    """
+    if isinstance(state, Mapping):
+        return (state.get('label', 'unknown'), state.get('balance_ralph', 0),
+                state.get('pct_supply', 0.0), state.get('last_tx_type'),
+                state.get('last_tx_amount', 0), bool(state.get('is_pool')))
+    return (state.label, state.balance_ralph, state.pct_supply, state.last_tx_type,
+            state.last_tx_amount, bool(getattr(state, 'is_pool', False)))
+
+
+def _partition_wallet_states(wallet_states: Dict) -> Tuple[List[tuple], List[Tuple[str, str, int]],
+                                                            List[Tuple[str, int]]]:
+    """Unpack every wallet state once into snapshot rows, whales and pools.
+
+    Returns (rows, whales, pools): wallet_history rows for all wallets,
+    (address, label, balance) for non-pool wallets and (address, balance)
+    for pool wallets.
+    """
+    rows = []
+    whales = []
+    pools = []
+    for addr, state in wallet_states.items():
+        label, balance, pct, tx_type, tx_amount, is_pool = _wallet_state_fields(state)
+        rows.append((addr, label, balance, pct, tx_type, tx_amount))
+        if is_pool:
+            pools.append((addr, balance))
+        else:
+            whales.append((addr, label, balance))
+    return rows, whales, pools
+
+
 class TrendTracker:
     """Main trend tracking class that integrates with RalphWhaleTracker."""
 
@@ -1461,109 +2348,161 @@ class TrendTracker:
         self.formatter = TrendFormatter()
 
         # Load config
-        import yaml
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+        config = _load_config(config_path)
 
         self.token_address = config.get("token", {}).get("address", "")
         self.token_decimals = config.get("token", {}).get("decimals", 9)
         self.total_supply = config.get("token", {}).get("total_supply", 1_000_000_000)
         self.rpc_url = config.get("settings", {}).get("rpc_url", "")
+        self._supply_raw = self.total_supply * (10 ** self.token_decimals)  # Supply in raw units
+
+        # Raw snapshots older than this are pruned once a day (0 keeps everything)
+        self.retention_days = config.get("settings", {}).get("trend_retention_days", 30)
+        self._next_maintenance = 0.0
+
+        # How long one DEX market-metrics fetch is reused (None = fetcher default)
+        self.market_metrics_ttl = config.get("settings", {}).get("market_metrics_ttl_seconds")
+
+        # Opt-in full getProgramAccounts scan for holder counts and owners
+        self.use_program_accounts = bool(config.get("settings", {}).get("use_program_accounts", False))
 
-        # Initialize components
-        self.dex_fetcher = DEXDataFetcher(self.token_address)
-        self.holder_tracker = HolderTracker(self.rpc_url, self.token_address, self.token_decimals)
-        self.analyzer = TrendAnalyzer(self.db, self.token_decimals, self.total_supply)
+        # DEX/holder/analyzer components are built on first use (below), so
+        # history-only callers never open HTTP sessions or worker threads
 
         # Store wallet info
         self.wallets = {w["address"]: w for w in config.get("wallets", [])}
+        # Address sets built once: the configured wallets, and the last set
+        # passed to run_full_discovery_cycle (reused while it is unchanged)
+        self._wallet_addresses = self.tracked_address_set(self.wallets)
+        self._tracked_addresses = self._wallet_addresses
         
         # Track last holder data for comparison
         self.last_holder_count = 0
         self.last_top_10_pct = 0.0
 
-    def record_snapshot(self, wallet_states: Dict):
-        """Record current wallet states to trend database."""
-        for addr, state in wallet_states.items():
-            # Handle both dict and dataclass states
-            if hasattr(state, 'balance_ralph'):
-                balance = state.balance_ralph
-                label = state.label
-                pct = state.pct_supply
-                tx_type = state.last_tx_type
-                tx_amount = state.last_tx_amount
-            else:
-                balance = state.get('balance_ralph', 0)
-                label = state.get('label', 'unknown')
-                pct = state.get('pct_supply', 0.0)
-                tx_type = state.get('last_tx_type')
-                tx_amount = state.get('last_tx_amount', 0)
-
-            self.db.record_wallet_balance(
-                wallet=addr,
-                label=label,
-                balance=balance,
-                pct_supply=pct,
-                tx_type=tx_type,
-                tx_amount=tx_amount
-            )
+        # Liquidity/holder trends computed by the most recent run_analysis()
+        self.last_liquidity_trend: Dict = {}
+        self.last_holder_trend: Dict = {}
+
+        # Timestamp of the last market snapshot written; metrics reused from
+        # the fetcher's TTL cache carry the same timestamp and are not rewritten
+        self._last_market_timestamp: Optional[str] = None
+
+    @cached_property
+    def dex_fetcher(self) -> DEXDataFetcher:
+        return DEXDataFetcher(self.token_address, metrics_ttl_seconds=self.market_metrics_ttl)
+
+    @cached_property
+    def holder_tracker(self) -> HolderTracker:
+        return HolderTracker(self.rpc_url, self.token_address, self.token_decimals,
+                             self.use_program_accounts)
+
+    @cached_property
+    def analyzer(self) -> TrendAnalyzer:
+        return TrendAnalyzer(self.db, self.token_decimals, self.total_supply)
+
+    @cached_property
+    def _pool(self) -> ThreadPoolExecutor:
+        # Market/RPC fetches run here while the database analysis proceeds.
+        # Scoring stays on the caller's thread: it takes tens of microseconds
+        # for dozens of whales and never holds up a fetch in flight.
+        return ThreadPoolExecutor(max_workers=1, thread_name_prefix="trend-fetch")
+
+    def record_snapshot(self, wallet_states: Dict, include_liquidity: bool = False):
+        """Record current wallet states to trend database.
+
+        With ``include_liquidity``, pool wallets' balances are also recorded
+        as liquidity snapshots in the same transaction.
+        """
+        rows, _, pools = _partition_wallet_states(wallet_states)
+        liquidity_rows = [(addr, balance, 0, 0.0) for addr, balance in pools] if include_liquidity else []
+        self.db.record_polling_cycle(rows, liquidity_rows)
+
+    def run_maintenance_if_due(self):
+        """Daily database upkeep: apply trend_retention_days, then refresh planner stats."""
+        if time.monotonic() < self._next_maintenance:
+            return
+        if self.retention_days > 0:
+            self.db.prune_history(self.retention_days)
+        self.db.analyze()
+        self._next_maintenance = time.monotonic() + 86400
 
     def record_liquidity(self, pool_address: str, token_balance: int,
                          sol_balance: int = 0, depth_usd: float = 0.0):
         """Record liquidity pool snapshot."""
         self.db.record_liquidity(pool_address, token_balance, sol_balance, depth_usd)
 
-    def fetch_and_record_market_data(self) -> Optional[MarketMetrics]:
-        """Fetch current market data and record it."""
-        metrics = self.dex_fetcher.get_market_metrics()
+    def _fetch_concentration(self, limit: int = 20) -> Tuple[Optional[List[Dict]], float, float]:
+        """Fetch the largest accounts and compute top-10/top-50 concentration.
+
+        Holders and supply come back from one batched RPC request; the
+        configured supply is used when the RPC does not report one.
+        """
+        largest, supply_raw = self.holder_tracker.get_largest_accounts_with_supply(limit)
+        if not largest:
+            return largest, 0.0, 0.0
+        if supply_raw <= 0:
+            supply_raw = self._supply_raw
+        top_10, top_50 = self.holder_tracker.calculate_concentration(largest, supply_raw)
+        return largest, top_10, top_50
+
+    def fetch_and_record_market_data(self, metrics: Optional[MarketMetrics] = None) -> Optional[MarketMetrics]:
+        """Fetch current market data and record it.
+
+        ``metrics`` already fetched by the caller are recorded instead of
+        fetching again. Metrics already recorded (a reuse within the
+        fetcher's TTL) are returned without writing another snapshot.
+        """
+        if metrics is None:
+            metrics = self.dex_fetcher.get_market_metrics()
 
         if metrics.price_usd > 0 or metrics.holder_count > 0:
-            self.db.record_market_metrics(metrics)
+            if metrics.timestamp == self._last_market_timestamp:
+                return metrics
 
             # Also record holder count separately for trend tracking
+            holder_count, top_10, top_50 = None, 0.0, 0.0
             if metrics.holder_count > 0:
+                holder_count = metrics.holder_count
                 # Get concentration data
-                largest = self.holder_tracker.get_token_largest_accounts()
-                if largest:
-                    top_10, top_50 = self.holder_tracker.calculate_concentration(
-                        largest, self.total_supply * (10 ** self.token_decimals)
-                    )
-                    self.db.record_holder_count(metrics.holder_count, top_10, top_50)
-                else:
-                    self.db.record_holder_count(metrics.holder_count)
+                _, top_10, top_50 = self._fetch_concentration()
 
+            self.db.record_market_snapshot(metrics, holder_count, top_10, top_50)
+            self._last_market_timestamp = metrics.timestamp
             return metrics
 
         return None
 
-    def run_analysis(self, wallet_states: Dict) -> TrendScore:
-        """Run full trend analysis and return score."""
-        # Record current states first
-        self.record_snapshot(wallet_states)
+    def run_analysis(self, wallet_states: Dict,
+                     market_metrics: Optional[MarketMetrics] = None) -> TrendScore:
+        """Run full trend analysis and return score.
 
-        # Fetch market data
-        market_metrics = self.fetch_and_record_market_data()
+        ``market_metrics`` fetched by the caller are recorded and scored
+        instead of fetching them again.
+        """
+        # Record current states first; the same pass splits out the whales
+        rows, whales, _ = _partition_wallet_states(wallet_states)
+        self.db.record_polling_cycle(rows)
 
-        # Analyze each whale
-        whale_metrics = []
-        for addr, state in wallet_states.items():
-            if hasattr(state, 'is_pool') and state.is_pool:
-                continue  # Skip pool for whale analysis
-            if isinstance(state, dict) and state.get('is_pool'):
-                continue
+        # Fetch market data in the background; it is network-bound and the
+        # wallet/liquidity analysis below does not depend on it
+        market_future = self._pool.submit(self.fetch_and_record_market_data, market_metrics)
 
-            if hasattr(state, 'balance_ralph'):
-                balance = state.balance_ralph
-                label = state.label
-            else:
-                balance = state.get('balance_ralph', 0)
-                label = state.get('label', 'unknown')
+        # Analyze the whales (pools excluded) against a single history fetch
+        whale_metrics = self.analyzer.analyze_wallet_trends(whales)
+
+        # Liquidity and holder trends are computed once here and reused by
+        # the report instead of being queried again
+        self.last_liquidity_trend = self.analyzer.analyze_liquidity_trend()
 
-            metrics = self.analyzer.analyze_wallet_trend(addr, label, balance)
-            whale_metrics.append(metrics)
+        # The holder trend reads the snapshot the market fetch records
+        market_metrics = market_future.result()
+        self.last_holder_trend = self.analyzer.analyze_holder_trend()
 
         # Calculate overall trend score
-        score = self.analyzer.calculate_trend_score(whale_metrics, market_metrics)
+        score = self.analyzer.calculate_trend_score(
+            whale_metrics, market_metrics, self.last_liquidity_trend, self.last_holder_trend
+        )
 
         # Record the score
         self.db.record_trend_score(score)
@@ -1588,28 +2527,30 @@ class TrendTracker:
             self.formatter.print_market_metrics(market_metrics)
 
         # Print liquidity and holder trends
-        liquidity_trend = self.analyzer.analyze_liquidity_trend()
-        holder_trend = self.analyzer.analyze_holder_trend()
-
-        self.formatter.print_liquidity_trend(liquidity_trend)
-        self.formatter.print_holder_trend(holder_trend)
+        self.formatter.print_liquidity_trend(self.last_liquidity_trend)
+        self.formatter.print_holder_trend(self.last_holder_trend)
 
         # Print decision summary
         self.formatter.print_decision_summary(score)
 
         return score
 
-    def get_trend_history(self, days: int = 7) -> List[TrendScore]:
-        """Get historical trend scores."""
-        return self.db.get_trend_score_history(days)
+    def get_trend_history(self, days: int = 7, limit: Optional[int] = None) -> List[TrendScore]:
+        """Get historical trend scores, newest first."""
+        return self.db.get_trend_score_history(days, limit)
+
+    @staticmethod
+    def tracked_address_set(addresses) -> frozenset:
+        """Frozen set of interned addresses for repeated membership checks."""
+        return frozenset(map(sys.intern, addresses))
 
-    def discover_new_whales(self, tracked_addresses: set = None) -> List[Dict]:
+    def discover_new_whales(self, tracked_addresses: Optional[AbstractSet[str]] = None) -> List[Dict]:
         """
         Discover new whale wallets that aren't being tracked.
         Records them in the database and returns newly discovered ones.
         """
         if tracked_addresses is None:
-            tracked_addresses = set(self.wallets.keys())
+            tracked_addresses = self._wallet_addresses
         
         new_whales = self.holder_tracker.discover_new_whales(
             tracked_addresses=tracked_addresses,
@@ -1617,19 +2558,22 @@ class TrendTracker:
             total_supply=self.total_supply
         )
         
-        newly_discovered = []
-        for whale in new_whales:
-            is_new = self.db.record_discovered_whale(
-                address=whale["address"],
-                token_account=whale["token_account"],
-                balance=whale["balance"],
-                pct_supply=whale["pct_supply"],
-                rank=whale["rank"]
-            )
-            if is_new:
-                newly_discovered.append(whale)
-                console.print(f"[green]🐋 New whale discovered: {whale['address'][:8]}... "
-                             f"({whale['balance_display']} RALPH, {whale['pct_supply']:.2f}%)[/green]")
+        # Record every candidate in one transaction
+        inserted = self.db.record_discovered_whales([
+            (whale["address"], whale["token_account"], whale["balance"],
+             whale["pct_supply"], whale["rank"])
+            for whale in new_whales
+        ])
+
+        newly_discovered = [whale for whale, is_new in zip(new_whales, inserted) if is_new]
+
+        # One console write for the whole batch
+        if newly_discovered:
+            console.print("\n".join(
+                f"[green]🐋 New whale discovered: {whale['address'][:8]}... "
+                f"({whale['balance_display']} RALPH, {whale['pct_supply']:.2f}%)[/green]"
+                for whale in newly_discovered
+            ))
         
         return newly_discovered
 
@@ -1641,23 +2585,20 @@ class TrendTracker:
         """Mark whales as notified after sending email."""
         self.db.mark_whales_notified(addresses)
 
+    def claim_unnotified_whales(self) -> List[Dict]:
+        """Fetch and mark unnotified whales in one atomic step."""
+        return self.db.claim_unnotified_whales()
+
     def get_holder_summary(self) -> Dict:
         """Get comprehensive holder summary for reports."""
         # Get concentration data
-        top_holders = self.holder_tracker.get_token_largest_accounts(limit=20)
+        top_holders, top_10_pct, top_50_pct = self._fetch_concentration()
         
         if top_holders:
-            total_raw = self.total_supply * (10 ** self.token_decimals)
-            top_10_pct, top_50_pct = self.holder_tracker.calculate_concentration(
-                top_holders, total_raw
-            )
-            
             # Record to database
             # Note: We don't have exact holder count without indexing all accounts
             # Using 0 as placeholder, trends will show change over time
             self.db.record_holder_count(0, top_10_pct, top_50_pct)
-        else:
-            top_10_pct, top_50_pct = 0.0, 0.0
         
         # Get historical data for trend
         holder_trend = self.analyzer.analyze_holder_trend()
@@ -1673,13 +2614,26 @@ class TrendTracker:
             "top_holders": top_holders[:10] if top_holders else []
         }
 
-    def run_full_discovery_cycle(self, wallet_states: Dict) -> Dict:
+    def run_full_discovery_cycle(self, wallet_states: Dict, claim_whales: bool = False) -> Dict:
         """
         Run a full discovery and analysis cycle.
         Returns summary data for email reports.
+
+        With ``claim_whales``, unnotified whales are marked as notified in the
+        same statement that reads them, after the analysis has succeeded.
         """
-        # Get tracked addresses
-        tracked = set(wallet_states.keys())
+        # Start the DEX fetch (independent of Solana RPC) before the RPC work
+        # below; its result is handed to run_analysis rather than refetched
+        market_future = self._pool.submit(self.dex_fetcher.get_market_metrics)
+
+        # Fetch the top holders once up front; discovery, the holder summary
+        # and the market snapshot below all read this same list
+        self.holder_tracker.refresh_top_holders(force=True)
+
+        # Get tracked addresses, reusing the cached set when nothing changed
+        if wallet_states.keys() != self._tracked_addresses:
+            self._tracked_addresses = self.tracked_address_set(wallet_states)
+        tracked = self._tracked_addresses
         
         # Discover new whales
         new_whales = self.discover_new_whales(tracked)
@@ -1687,11 +2641,14 @@ class TrendTracker:
         # Get holder summary
         holder_summary = self.get_holder_summary()
         
-        # Get unnotified whales (including any from previous runs)
-        unnotified = self.get_unnotified_whales()
-        
         # Run trend analysis
-        score, whale_metrics, market_metrics = self.run_analysis(wallet_states)
+        score, whale_metrics, market_metrics = self.run_analysis(wallet_states, market_future.result())
+
+        # Get unnotified whales (including any from previous runs)
+        if claim_whales:
+            unnotified = self.claim_unnotified_whales()
+        else:
+            unnotified = self.get_unnotified_whales()
         
         return {
             "new_whales": new_whales,
@@ -1741,13 +2698,19 @@ def main():
 
     if args.history:
         # Show history
-        scores = tracker.get_trend_history(args.history)
+        scores = tracker.get_trend_history(args.history, limit=20)  # Show last 20
         console.print(f"\n[bold]Trend Score History ({args.history} days)[/bold]\n")
 
-        for score in scores[:20]:  # Show last 20
-            color = tracker.formatter.SIGNAL_COLORS[score.signal]
-            console.print(f"{score.timestamp[:16]} | [{color}]{score.signal.value:15}[/{color}] | "
-                         f"Score: {score.score:+4d} | Confidence: {score.confidence*100:.0f}%")
+        # Styled spans instead of inline markup: one Text, no per-row markup parsing
+        signal_colors = tracker.formatter.SIGNAL_COLORS
+        history = Text()
+        for score in scores:
+            history.append(f"{score.timestamp[:16]} | ")
+            history.append(f"{score.signal.value:15}", style=signal_colors[score.signal])
+            history.append(f" | Score: {score.score:+4d} | Confidence: {score.confidence*100:.0f}%\n")
+        history.rstrip()
+        if history:
+            console.print(history)
     else:
         console.print("[yellow]Use with ralph_tracker.py for full trend analysis[/yellow]")
         console.print("Run: python ralph_tracker.py --trends")
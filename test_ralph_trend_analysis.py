@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Tests for ralph_trend_analysis.py — trend database reductions.
+
+Coverage:
+- Legacy ISO-text timestamp migration and epoch round trip (2 tests)
+- Wallet trend aggregates: exact net flow above 2**53 and past int64 (4 tests)
+- Batched wallet trends vs per-row Python reduction (1 test)
+- Empty wallet metrics are independent instances (1 test)
+- Background writer survives bad write groups; close() releases the exit hook (2 tests)
+- Wallet states given as any mapping or as a dataclass (1 test)
+- Single-account owner lookups use the bounded owner cache (1 test)
+- getProgramAccounts scans: opt-in, failures not cached, owners interned (3 tests)
+- Market metrics reused within the TTL are recorded once (1 test)
+- Discovery cycle hands its prefetched metrics to the analysis (1 test)
+
+Run: pytest test_ralph_trend_analysis.py -v
+"""
+
+import gc
+import sqlite3
+import sys
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from types import MappingProxyType, SimpleNamespace
+
+import pytest
+
+import ralph_trend_analysis
+from ralph_trend_analysis import (
+    TrendDatabase,
+    TrendAnalyzer,
+    HeliusClient,
+    HolderTracker,
+    TrendTracker,
+    _SQL_INSERT_WALLET_BALANCE,
+    _to_epoch,
+    _to_iso,
+    _wallet_state_fields,
+)
+
+
+# ============================================================
+# HELPERS
+# ============================================================
+
+# A whale's sticky last_tx_amount in raw units (6 decimals), repeated on
+# every snapshot row: 40 rows sum past 2**63
+LARGE_AMOUNT = 500_000_000 * 10**6 * 1_000
+LARGE_ROWS = 40
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A fresh trend database, closed after the test."""
+    with TrendDatabase(str(tmp_path / "trends.db")) as database:
+        yield database
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    """A TrendTracker on a fresh database with a minimal config, closed after the test."""
+    config = tmp_path / "config.yaml"
+    config.write_text("token:\n  address: MINT\n  decimals: 6\n")
+    trend_tracker = TrendTracker(str(config), str(tmp_path / "trends.db"))
+    yield trend_tracker
+    trend_tracker.db.close()
+
+
+def insert_history(db: TrendDatabase, wallet: str, rows: list):
+    """Insert (balance, tx_type, tx_amount) snapshots one minute apart, oldest first."""
+    start = int(time.time()) - 3600
+    db._execute_write(_SQL_INSERT_WALLET_BALANCE, [
+        (wallet, wallet, balance, 1.0, tx_type, tx_amount, start + 60 * i)
+        for i, (balance, tx_type, tx_amount) in enumerate(rows)
+    ])
+
+
+# ============================================================
+# LEGACY TIMESTAMP MIGRATION (2 tests)
+# ============================================================
+
+class TestLegacyMigration:
+
+    def test_unparseable_legacy_timestamps_are_dropped(self, tmp_path):
+        """ISO-text rows migrate to epoch seconds; rows that don't parse are not back-filled."""
+        path = str(tmp_path / "legacy.db")
+        conn = sqlite3.connect(path)
+        conn.execute("""
+            CREATE TABLE wallet_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                wallet TEXT NOT NULL, label TEXT NOT NULL,
+                balance INTEGER NOT NULL, pct_supply REAL NOT NULL,
+                tx_type TEXT, tx_amount INTEGER DEFAULT 0,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(wallet, timestamp)
+            )
+        """)
+        conn.executemany(
+            "INSERT INTO wallet_history (wallet, label, balance, pct_supply, timestamp) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [('W', 'w', 100, 1.0, '2024-01-02 03:04:05'), ('W', 'w', 200, 1.0, 'not a time')])
+        conn.commit()
+        conn.close()
+
+        db = TrendDatabase(path)
+        try:
+            rows = db._query("SELECT balance, timestamp FROM wallet_history")
+        finally:
+            db.close()
+
+        assert rows == [(100, _to_epoch('2024-01-02T03:04:05'))]
+
+    def test_iso_round_trip(self):
+        """_to_iso gives the naive-UTC ISO form that _to_epoch reads back."""
+        assert _to_iso(1704164645) == '2024-01-02T03:04:05'
+        assert _to_epoch(_to_iso(1704164645)) == 1704164645
+
+
+# ============================================================
+# WALLET TREND AGGREGATES (4 tests)
+# ============================================================
+
+class TestWalletTrendAggregates:
+
+    def test_batch_net_flow_past_int64(self, db):
+        """Net flow summing past 2**63 is returned exactly instead of overflowing SQLite."""
+        insert_history(db, 'W', [(LARGE_AMOUNT, 'BUY', LARGE_AMOUNT + 1)] * LARGE_ROWS)
+        assert LARGE_AMOUNT * LARGE_ROWS > 2**63
+
+        aggregates = db.get_wallet_trend_aggregates(1)
+
+        assert aggregates['W'] == (LARGE_AMOUNT, LARGE_ROWS, 0, (LARGE_AMOUNT + 1) * LARGE_ROWS)
+
+    def test_batch_net_flow_exact_above_float_precision(self, db):
+        """A net flow between 2**53 and 2**63 is summed in SQL without float rounding."""
+        insert_history(db, 'W', [(1, 'BUY', 2**60 + 1)] * 3 + [(1, 'SELL', 1)])
+
+        aggregates = db.get_wallet_trend_aggregates(1, ['W'])
+
+        assert aggregates == {'W': (1, 3, 1, 3 * 2**60 + 2)}
+
+    def test_single_wallet_net_flow_past_int64(self, db):
+        """The single-wallet aggregate sums past 2**63 exactly without overflowing."""
+        insert_history(db, 'W', [(LARGE_AMOUNT, 'SELL', LARGE_AMOUNT + 1)] * LARGE_ROWS)
+
+        aggregate = db.get_wallet_trend_aggregate('W', 1)
+
+        assert aggregate == (LARGE_AMOUNT, 0, LARGE_ROWS, -(LARGE_AMOUNT + 1) * LARGE_ROWS)
+        assert db.get_wallet_trend_aggregate('missing', 1) is None
+
+    def test_single_wallet_net_flow_exact_above_float_precision(self, db):
+        """The single-wallet SQL sum between 2**53 and 2**63 has no float rounding."""
+        insert_history(db, 'W', [(1, 'SELL', 2**60 + 1)] * 3 + [(1, 'BUY', 1)])
+
+        assert db.get_wallet_trend_aggregate('W', 1) == (1, 1, 3, -3 * 2**60 - 2)
+
+
+# ============================================================
+# BATCHED WALLET TRENDS (1 test)
+# ============================================================
+
+class TestBatchedWalletTrends:
+
+    def test_batch_matches_python_reduction_on_large_amounts(self, db):
+        """analyze_wallet_trends (SQL) agrees with the in-memory reduction at raw-unit scale."""
+        insert_history(db, 'ACC', [(LARGE_AMOUNT + i, 'BUY', LARGE_AMOUNT) for i in range(LARGE_ROWS)])
+        insert_history(db, 'DIST', [(LARGE_AMOUNT * 2, 'SELL', LARGE_AMOUNT)] * LARGE_ROWS)
+        insert_history(db, 'MIXED', [
+            (LARGE_AMOUNT, ('BUY', 'SELL', None)[i % 3], LARGE_AMOUNT // (i + 1))
+            for i in range(LARGE_ROWS)
+        ])
+        wallets = [
+            ('ACC', 'acc', LARGE_AMOUNT * 3),
+            ('DIST', 'dist', LARGE_AMOUNT),
+            ('MIXED', 'mixed', LARGE_AMOUNT),
+            ('COLD', 'cold', 12345),  # no history in the window
+        ]
+        analyzer = TrendAnalyzer(db, token_decimals=6)
+
+        batched = analyzer.analyze_wallet_trends(wallets, days=1)
+        reduced = [
+            analyzer.analyze_wallet_trend(*wallet, days=1, history=db.get_wallet_history(wallet[0], 1))
+            for wallet in wallets
+        ]
+
+        for batch, python in zip(batched, reduced):
+            assert batch == python, batch.wallet
+        assert abs(reduced[0].net_flow_7d) > 2**63
+
+
+# ============================================================
+# EMPTY WALLET METRICS (1 test)
+# ============================================================
+
+class TestEmptyWalletMetrics:
+
+    def test_each_call_returns_a_fresh_instance(self, db):
+        """Mutating one cold wallet's metrics never leaks into the next result."""
+        analyzer = TrendAnalyzer(db, token_decimals=6)
+        first = analyzer.analyze_wallet_trends([('COLD', 'cold', 100)])[0]
+        first.buy_count_7d = 99
+
+        second = analyzer.analyze_wallet_trends([('COLD', 'cold', 100)])[0]
+
+        assert second is not first
+        assert second.buy_count_7d == 0
+
+
+# ============================================================
+# BACKGROUND WRITER (2 tests)
+# ============================================================
+
+class TestBackgroundWriter:
+
+    def test_bad_group_does_not_kill_writer(self, db):
+        """A malformed group is dropped; later writes in and after its batch still commit."""
+        db._write_group(((_SQL_INSERT_WALLET_BALANCE, None),))  # TypeError, not sqlite3.Error
+        db.record_wallet_balance('W', 'w', 100, 1.0, 'BUY', 5)
+
+        flushed = threading.Thread(target=db.flush, daemon=True)
+        flushed.start()
+        flushed.join(timeout=5)
+
+        assert not flushed.is_alive(), "flush() blocked: queued writes were never marked done"
+        assert db._writer.is_alive()
+        assert [row[0] for row in db.get_wallet_history('W', 1)] == [100]
+
+    def test_closed_database_is_released(self, tmp_path):
+        """close() drops the exit hook, so nothing keeps a closed database alive."""
+        with TrendDatabase(str(tmp_path / "trends.db")) as database:
+            database.record_wallet_balance('W', 'w', 100, 1.0)
+        ref = weakref.ref(database)
+
+        del database
+        gc.collect()
+
+        assert ref() is None
+
+
+# ============================================================
+# WALLET STATE FIELDS (1 test)
+# ============================================================
+
+class TestWalletStateFields:
+
+    @pytest.mark.parametrize("wrap", [dict, OrderedDict, MappingProxyType])
+    def test_mappings_and_objects_agree(self, wrap):
+        """Any Mapping reads by key; a WalletState-like object reads by attribute."""
+        fields = {'label': 'w', 'balance_ralph': 100, 'pct_supply': 1.0,
+                  'last_tx_type': 'BUY', 'last_tx_amount': 5}
+        expected = ('w', 100, 1.0, 'BUY', 5, False)
+
+        assert _wallet_state_fields(wrap(fields)) == expected
+        assert _wallet_state_fields(SimpleNamespace(**fields)) == expected
+
+
+# ============================================================
+# OWNER CACHE (1 test)
+# ============================================================
+
+class TestOwnerCache:
+
+    def test_single_lookups_are_cached_and_bounded(self, monkeypatch):
+        """resolve_token_account_owner fills the cache once per account, oldest evicted first."""
+        client = HeliusClient("http://localhost:1", "MINT")
+        monkeypatch.setattr(HeliusClient, "OWNER_CACHE_SIZE", 2)
+        calls = []
+
+        def fake_account_info(address):
+            calls.append(address)
+            return {"data": {"parsed": {"info": {"owner": f"owner-{address}"}}}}
+
+        monkeypatch.setattr(client, "get_account_info", fake_account_info)
+
+        assert client.resolve_token_account_owner("a") == "owner-a"
+        assert client.resolve_token_account_owner("a") == "owner-a"
+        assert calls == ["a"]
+
+        client.resolve_token_account_owner("b")
+        client.resolve_token_account_owner("c")
+        assert list(client._owner_cache) == ["b", "c"]
+
+
+# ============================================================
+# PROGRAM ACCOUNT SCANS (3 tests)
+# ============================================================
+
+def program_account(pubkey: str, owner: str, amount: int) -> dict:
+    """A jsonParsed getProgramAccounts entry."""
+    return {"pubkey": pubkey, "account": {"data": {"parsed": {"info": {
+        "owner": owner, "tokenAmount": {"amount": str(amount), "decimals": 6}}}}}}
+
+
+class TestProgramAccounts:
+
+    @staticmethod
+    def stub_rpc(monkeypatch, responses: list) -> list:
+        """Answer post_json_rpc from ``responses`` in order; returns the list of calls."""
+        calls = []
+
+        def fake_post(session, url, payload, timeout=None):
+            calls.append(payload["method"])
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        monkeypatch.setattr(ralph_trend_analysis, "post_json_rpc", fake_post)
+        return calls
+
+    def test_scan_is_opt_in(self, monkeypatch):
+        """Without use_program_accounts no scan is requested."""
+        calls = self.stub_rpc(monkeypatch, [])
+        client = HeliusClient("http://localhost:1", "MINT")
+
+        assert client.get_all_token_accounts_parsed() is None
+        assert calls == []
+
+    def test_failures_are_not_cached(self, monkeypatch):
+        """A failed scan is retried on the next call; a successful one is reused."""
+        accounts = [program_account("acct", "owner", 5)]
+        calls = self.stub_rpc(monkeypatch, [ConnectionError("down"), {"result": accounts}])
+        client = HeliusClient("http://localhost:1", "MINT", use_program_accounts=True)
+
+        assert client.get_all_token_accounts_parsed() is None
+        assert client.get_all_token_accounts_parsed() == accounts
+        assert client.get_all_token_accounts_parsed() == accounts
+        assert calls == ["getProgramAccounts", "getProgramAccounts"]
+
+    def test_top_holder_owners_are_interned(self, monkeypatch):
+        """Owners from the scan are interned, like single-account lookups."""
+        owner = "".join(["ow", "ner"])  # built at runtime, so not interned already
+        self.stub_rpc(monkeypatch, [{"result": [program_account("small", "other", 1),
+                                                program_account("big", owner, 9)]}])
+        tracker = HolderTracker("http://localhost:1", "MINT", 6, use_program_accounts=True)
+
+        holders = tracker.get_top_holders_with_owners(limit=1)
+
+        assert [holder["token_account"] for holder in holders] == ["big"]
+        assert holders[0]["owner"] is sys.intern("owner")
+
+
+# ============================================================
+# MARKET METRICS REUSE (2 tests)
+# ============================================================
+
+class TestMarketMetricsReuse:
+
+    @staticmethod
+    def stub_dex_apis(tracker, monkeypatch) -> list:
+        """Replace the Jupiter/Birdeye calls; returns the list each price call appends to."""
+        fetcher = tracker.dex_fetcher
+        calls = []
+
+        def fake_price():
+            calls.append("price")
+            return {"price": 1.5}
+
+        monkeypatch.setattr(fetcher, "get_token_price", fake_price)
+        monkeypatch.setattr(fetcher, "get_token_overview", lambda: None)
+        return calls
+
+    def test_reused_metrics_are_not_recorded_twice(self, tracker, monkeypatch):
+        """Two fetches within the TTL make one API call and write one market snapshot."""
+        calls = self.stub_dex_apis(tracker, monkeypatch)
+
+        first = tracker.fetch_and_record_market_data()
+        second = tracker.fetch_and_record_market_data()
+
+        assert second is first
+        assert calls == ["price"]
+        assert len(tracker.db.get_market_history(1)) == 1
+
+    def test_discovery_cycle_fetches_once_without_reuse(self, tracker, monkeypatch):
+        """With the TTL at 0, the prefetched metrics are scored and recorded, not refetched."""
+        calls = self.stub_dex_apis(tracker, monkeypatch)
+        tracker.dex_fetcher.metrics_ttl_seconds = 0
+        monkeypatch.setattr(tracker.holder_tracker, "refresh_top_holders", lambda force=False: (None, 0))
+        monkeypatch.setattr(tracker, "discover_new_whales", lambda tracked=None: [])
+        monkeypatch.setattr(tracker, "get_holder_summary", lambda: {})
+
+        summary = tracker.run_full_discovery_cycle({})
+
+        assert calls == ["price"]
+        assert summary["market_metrics"].price_usd == 1.5
+        assert len(tracker.db.get_market_history(1)) == 1